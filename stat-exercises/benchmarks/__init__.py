@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the computations in the serie-* scripts.
+
+The modules follow asv's conventions: classes with ``params`` and
+``param_names``, a ``setup`` method, and ``time_*`` and ``peakmem_*``
+benchmarks. ``python3 -m benchmarks.run`` runs them offline from the
+stat-exercises directory and compares the results with an earlier run.
+"""
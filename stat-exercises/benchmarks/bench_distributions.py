@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""serie-03/04: distribution function calls."""
+
+import numpy as np
+from scipy.stats import norm, t
+
+
+class NormalCdfPpf:
+    params = [1, 1000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.x = np.linspace(14, 50, n)
+        self.q = np.linspace(0.001, 0.999, n)
+
+    def time_cdf(self, n):
+        norm.cdf(x=self.x, loc=32, scale=6)
+
+    def time_ppf(self, n):
+        norm.ppf(q=self.q, loc=32, scale=6)
+
+    def time_t_ppf(self, n):
+        t.ppf(q=self.q, df=11)
+
+
+class ScalarCalls:
+    params = [10, 1000]
+    param_names = ['calls']
+
+    def time_cdf_loop(self, calls):
+        for x in range(calls):
+            norm.cdf(x=x % 50, loc=32, scale=6)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""serie-01: descriptive statistics, ranking and derived columns."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from statlib.topk import topk
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'serie-01')
+
+
+def child_table(n, seed=1):
+    """The child.csv table, resampled to ``n`` rows."""
+    child = pd.read_csv(os.path.join(DATA, 'child.csv'), index_col=0)
+    rng = np.random.default_rng(seed)
+    rows = child.iloc[rng.integers(0, len(child), n)]
+    return rows.set_axis(['{}-{}'.format(c, i)
+                          for i, c in enumerate(rows.index)])
+
+
+class Describe:
+    params = [1000, 100000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.data = child_table(n)
+
+    def time_describe(self, n):
+        self.data.describe()
+
+    def peakmem_describe(self, n):
+        self.data.describe()
+
+
+class TopDrunkenness:
+    params = [1000, 100000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.data = child_table(n)
+
+    def time_sort_values(self, n):
+        self.data.sort_values(by='Drunkenness', ascending=False)[:5]
+
+    def time_topk(self, n):
+        topk(self.data, ['Drunkenness'], k=5)
+
+    def time_below_mean(self, n):
+        col = 'Physical.activity'
+        low = self.data.loc[self.data[col] < self.data[col].mean()]
+        low.sort_values(by=col)
+
+
+class UnitConversion:
+    params = [1000, 100000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        rng = np.random.default_rng(1)
+        self.fuel = pd.DataFrame({'mpg': rng.uniform(15, 35, n),
+                                  'weight': rng.uniform(2000, 4000, n)})
+
+    def time_list_comprehension(self, n):
+        pd.Series([e * (1.6093/3.7891) for e in self.fuel['mpg']]).mean()
+
+    def time_vectorized(self, n):
+        (self.fuel['mpg'] * (1.6093/3.7891)).mean()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""serie-02: line fits and correlations."""
+
+import numpy as np
+
+from statlib import regboot, robust
+
+
+def income_like(n, seed=1):
+    rng = np.random.default_rng(seed)
+    educ = rng.integers(6, 21, n).astype(float)
+    income = 6000 * educ - 30000 + rng.standard_t(3, n) * 20000
+    return educ, income
+
+
+class LineFit:
+    params = [100, 10000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.x, self.y = income_like(n)
+
+    def time_polyfit(self, n):
+        np.polyfit(self.x, self.y, deg=1)
+
+    def time_corrcoef(self, n):
+        np.corrcoef(self.x, self.y)
+
+
+class RegressionBootstrap:
+    params = [100, 2584]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.x, self.y = income_like(n)
+
+    def time_pairs(self, n):
+        regboot.bootstrap(self.x, self.y, nboot=2000, workers=1, seed=1)
+
+    def peakmem_pairs(self, n):
+        regboot.bootstrap(self.x, self.y, nboot=2000, workers=1, seed=1)
+
+
+class RobustFit:
+    params = [1000, 10000]
+    param_names = ['n']
+
+    def setup(self, n):
+        rng = np.random.default_rng(1)
+        self.x = rng.normal(size=n)
+        self.y = 2 * self.x + rng.standard_t(2, n)
+
+    def time_theil_sen(self, n):
+        robust.theil_sen(self.x, self.y, rng=1)
+
+    def time_huber(self, n):
+        robust.huber(self.x, self.y)
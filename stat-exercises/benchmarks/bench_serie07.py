@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""serie-07: bootstrap intervals and coverage studies."""
+
+import numpy as np
+
+from statlib import bootstrap
+
+
+class Interval:
+    params = [[10, 100], [1000, 100000], ['percentile', 'bca', 'studentized']]
+    param_names = ['n', 'nboot', 'method']
+
+    def setup(self, n, nboot, method):
+        self.x = np.random.default_rng(1).normal(40, 5, n)
+
+    def time_interval(self, n, nboot, method):
+        bootstrap.interval(self.x, method=method, nboot=nboot, rng=1)
+
+    def peakmem_interval(self, n, nboot, method):
+        bootstrap.interval(self.x, method=method, nboot=nboot, rng=1)
+
+
+class Coverage:
+    params = [[100, 1000], ['double', 'single']]
+    param_names = ['runs', 'precision']
+
+    def setup(self, runs, precision):
+        rng = np.random.default_rng(1)
+        self.samples = rng.normal(40, 5, (runs, 100))
+
+    def time_coverage(self, runs, precision):
+        rng = np.random.default_rng(1)
+        k = 0
+        for x in self.samples:
+            ci = bootstrap.interval(x, method='basic', nboot=1000, rng=rng,
+                                    policy=precision)
+            k += ci.low <= 40 <= ci.high
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""serie-04/05: central limit theorem simulations."""
+
+import numpy as np
+from scipy.stats import norm
+
+from statlib.alias import Discrete
+from statlib.precision import get_policy, mean
+from statlib.rng import Buffered
+
+
+class NormalMeans:
+    params = [[2, 10, 100], [500, 100000], ['double', 'single']]
+    param_names = ['n', 'm', 'precision']
+
+    def time_scipy_rvs(self, n, m, precision):
+        norm.rvs(size=n*m).reshape((n, m)).mean(axis=0)
+
+    def time_generator(self, n, m, precision):
+        rng = np.random.default_rng(1)
+        dtype = get_policy(precision).dtype
+        sim = rng.standard_normal((m, n), dtype=dtype)
+        mean(sim, axis=1, policy=precision)
+
+    def peakmem_generator(self, n, m, precision):
+        rng = np.random.default_rng(1)
+        dtype = get_policy(precision).dtype
+        sim = rng.standard_normal((m, n), dtype=dtype)
+        mean(sim, axis=1, policy=precision)
+
+
+class DiscreteMeans:
+    params = [[5, 200], [1000, 100000]]
+    param_names = ['n', 'm']
+
+    def setup(self, n, m):
+        self.values = np.array([0, 10, 11])
+        self.dist = Discrete(self.values)
+
+    def time_random_choice(self, n, m):
+        np.random.choice(self.values, size=n*m, replace=True) \
+            .reshape((n, m)).mean(axis=0)
+
+    def time_alias(self, n, m):
+        self.dist.sample((m, n), rng=1).mean(axis=1)
+
+    def time_counts(self, n, m):
+        self.dist.means(n, m, rng=1)
+
+
+class SmallDraws:
+    params = [1000]
+    param_names = ['calls']
+
+    def time_scipy_rvs(self, calls):
+        for _ in range(calls):
+            norm.rvs(size=20)
+
+    def time_buffered(self, calls):
+        buffered = Buffered(np.random.default_rng(1))
+        for _ in range(calls):
+            buffered.normal(20)
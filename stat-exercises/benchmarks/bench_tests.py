@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""serie-06: hypothesis tests."""
+
+import numpy as np
+from scipy import stats
+
+from statlib import twosample
+
+
+class OneSampleT:
+    params = [12, 1000, 100000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.x = np.random.default_rng(1).normal(70, 1.96, n)
+
+    def time_ttest_1samp(self, n):
+        stats.ttest_1samp(self.x, 70, alternative='less')
+
+    def time_by_hand(self, n):
+        T = (self.x.mean() - 70) / (self.x.std(ddof=1) / np.sqrt(n))
+        stats.t.cdf(T, df=n-1)
+
+
+class TwoSample:
+    params = [[10, 1000], [2, 20]]
+    param_names = ['n', 'groups']
+
+    def setup(self, n, groups):
+        rng = np.random.default_rng(1)
+        self.groups = [rng.normal(80, 0.03, n) for _ in range(groups)]
+
+    def time_welch_pairs(self, n, groups):
+        twosample.welch_pairs(self.groups)
+
+    def time_scipy_loop(self, n, groups):
+        for i in range(groups):
+            for j in range(i + 1, groups):
+                stats.ttest_ind(self.groups[i], self.groups[j],
+                                equal_var=False)
+
+    def time_permutation(self, n, groups):
+        twosample.permutation_test(self.groups[0], self.groups[1],
+                                   n_perm=10000, workers=1, seed=1)
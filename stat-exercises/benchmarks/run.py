@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Offline runner for the asv-style benchmarks in this package.
+
+    python3 -m benchmarks.run [-b PATTERN] [--compare FILE] [--factor 1.2]
+
+Each ``time_*`` benchmark is timed as the best of several repeats, each
+``peakmem_*`` benchmark by the peak of memory traced with tracemalloc. The
+results are written to benchmarks/results/<commit>.json, suffixed -dirty
+while stat-exercises has uncommitted changes; a ``-b`` run only replaces the
+benchmarks it selected. They are compared with the previous results file
+(or ``--compare``); benchmarks that got slower or bigger by more than
+``--factor`` are flagged as regressions, and the exit status is 1 if there
+are any.
+"""
+
+import argparse
+import gc
+import importlib
+import inspect
+from itertools import product
+import json
+import os
+import pkgutil
+import re
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# the code being measured: statlib and the series, not just the benchmarks
+TREE = os.path.dirname(HERE)
+RESULTS = os.path.join(HERE, 'results')
+
+
+def discover(pattern=None):
+    """Yield (name, class, method name) of every benchmark."""
+    import benchmarks
+    for info in pkgutil.iter_modules(benchmarks.__path__):
+        if not info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module('benchmarks.' + info.name)
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for meth in sorted(vars(cls)):
+                if not meth.startswith(('time_', 'peakmem_')):
+                    continue
+                name = '{}.{}.{}'.format(info.name, cls_name, meth)
+                if pattern is None or re.search(pattern, name):
+                    yield name, cls, meth
+
+
+def param_sets(cls):
+    params = getattr(cls, 'params', [])
+    if not params:
+        return [()]
+    if not isinstance(params[0], list):
+        params = [params]
+    return list(product(*params))
+
+
+def _time(bench, args, repeat=5):
+    timer = timeit.Timer(lambda: bench(*args))
+    # as many calls per repeat as fit into about 0.2s
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _peakmem(bench, args):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        bench(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run(pattern=None, quick=False):
+    results = {}
+    for name, cls, meth in discover(pattern):
+        for args in param_sets(cls):
+            obj = cls()
+            if hasattr(obj, 'setup'):
+                obj.setup(*args)
+            bench = getattr(obj, meth)
+            if meth.startswith('time_'):
+                value = _time(bench, args, repeat=1 if quick else 5)
+                unit = 's'
+            else:
+                value = _peakmem(bench, args)
+                unit = 'B'
+            if hasattr(obj, 'teardown'):
+                obj.teardown(*args)
+            key = '{}({})'.format(name, ', '.join(map(repr, args)))
+            results[key] = {'value': value, 'unit': unit}
+            print('{:80s} {}'.format(key, _format(value, unit)), flush=True)
+    return results
+
+
+def _format(value, unit):
+    if unit == 's':
+        for scale, suffix in [(1, 's'), (1e-3, 'ms'), (1e-6, 'μs')]:
+            if value >= scale:
+                return '{:8.3f}{}'.format(value / scale, suffix)
+        return '{:8.3f}ns'.format(value / 1e-9)
+    return '{:8.1f}MB'.format(value / 2**20)
+
+
+def commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                             capture_output=True, text=True, cwd=HERE)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '.'],
+                               capture_output=True, text=True, cwd=TREE)
+    except OSError:
+        return 'unknown'
+    rev = out.stdout.strip() or 'unknown'
+    return rev + ('-dirty' if dirty.stdout.strip() else '')
+
+
+def previous(exclude):
+    if not os.path.isdir(RESULTS):
+        return None
+    files = [os.path.join(RESULTS, f) for f in os.listdir(RESULTS)
+             if f.endswith('.json')]
+    files = [f for f in files if os.path.abspath(f) != os.path.abspath(exclude)]
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def compare(old, new, factor):
+    regressions = []
+    for key, res in new.items():
+        if key not in old:
+            continue
+        before = old[key]['value']
+        ratio = res['value'] / before if before else 1.0
+        if ratio > factor:
+            regressions.append((key, before, res['value'], ratio, res['unit']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-b', '--bench', help='regex selecting benchmarks')
+    parser.add_argument('--compare', help='results file to compare with')
+    parser.add_argument('--factor', type=float, default=1.2,
+                        help='ratio counted as a regression (default 1.2)')
+    parser.add_argument('--quick', action='store_true',
+                        help='single repeat per timing')
+    args = parser.parse_args(argv)
+
+    results = run(args.bench, args.quick)
+    os.makedirs(RESULTS, exist_ok=True)
+    path = os.path.join(RESULTS, commit() + '.json')
+    stored = {}
+    if args.bench and os.path.exists(path):
+        # a filtered run only replaces the benchmarks it ran
+        with open(path) as f:
+            stored = json.load(f)
+    stored.update(results)
+    with open(path, 'w') as f:
+        json.dump(stored, f, indent=1, sort_keys=True)
+    print('\nresults written to {}'.format(os.path.relpath(path)))
+
+    other = args.compare or previous(path)
+    if other is None:
+        return 0
+    with open(other) as f:
+        old = json.load(f)
+    regressions = compare(old, results, args.factor)
+    print('compared with {}: {} regression(s)'.format(
+        os.path.relpath(other), len(regressions)))
+    for key, before, after, ratio, unit in regressions:
+        print('  {} {} -> {} ({:.2f}x)'.format(
+            key, _format(before, unit).strip(), _format(after, unit).strip(),
+            ratio))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
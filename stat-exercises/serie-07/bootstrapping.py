@@ -30,7 +30,7 @@ d = xbar - 2 * xbarstar.std(), xbar + 2 * xbarstar.std()
 print('confidence interval: ', d)
 
 # confidence interval
-d = np.percentile(xbarstar, q=[2.5, 92.5])
+d = np.percentile(xbarstar, q=[2.5, 97.5])
 print('confidence interval: ', d)
 
 # plot
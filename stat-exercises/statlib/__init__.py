@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Shared helpers for the exercise scripts in the serie-* directories.
+
+The modules are run from the stat-exercises directory, e.g.
+``python3 -m statlib.twosample``; their demos read the data files by paths
+relative to it, like ``'serie-01/fuel.csv'``.
+"""
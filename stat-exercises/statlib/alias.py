@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Walker/Vose alias sampler for discrete empirical distributions.
+
+The alias table is built once in O(k) for k support points; every draw then
+costs a single uniform, independent of k.
+"""
+
+import numpy as np
+
+from statlib.precision import index_dtype
+
+
+class Discrete:
+    """A discrete distribution over ``values`` with optional ``weights``.
+
+    Repeated values are allowed, so ``Discrete(x)`` samples from the
+    empirical distribution of a data set ``x``, as a bootstrap does.
+    """
+
+    def __init__(self, values, weights=None):
+        self.values = np.asarray(values)
+        k = self.values.size
+        if weights is None:
+            p = np.full(k, 1 / k)
+        else:
+            p = np.asarray(weights, dtype=float)
+            if p.shape != self.values.shape or (p < 0).any() or p.sum() <= 0:
+                raise ValueError('weights must be non-negative and match values')
+            p = p / p.sum()
+        self.p = p
+        self.prob, self.alias = _vose(p)
+        self._buf = {}
+
+    def _scratch(self, name, n, dtype=np.float64):
+        # arrays reused between draws, grown when a larger draw comes along
+        buf = self._buf.get(name)
+        if buf is None or buf.size < n or buf.dtype != dtype:
+            buf = self._buf[name] = np.empty(n, dtype=dtype)
+        return buf[:n]
+
+    def sample_index(self, size, rng=None, out=None, policy=None):
+        """Draw support indices; ``out`` may be a preallocated, C-contiguous
+        int array.
+
+        Without ``out``, the indices are stored in the integer type of the
+        precision ``policy``, e.g. uint8 for up to 256 support points.
+
+        A single uniform per draw picks the column (integer part of u·k) and
+        decides between it and its alias (fractional part).
+        """
+        rng = np.random.default_rng(rng)
+        if out is None:
+            out = np.empty(size, dtype=index_dtype(self.p.size, policy))
+        elif not out.flags.c_contiguous:
+            # reshape would copy, and the draws would be lost
+            raise ValueError('out must be C-contiguous')
+        flat = out.reshape(-1)
+        n = flat.size
+        u = self._scratch('u', n)
+        p = self._scratch('p', n)
+        reject = self._scratch('reject', n, bool)
+        alias = self._scratch('alias', n, flat.dtype)
+        rng.random(out=u)
+        u *= self.p.size
+        np.copyto(flat, u, casting='unsafe')
+        # u·k can round up to k itself
+        np.minimum(flat, self.p.size - 1, out=flat)
+        u -= flat
+        # the indices are in range; mode='raise' would buffer a copy of out
+        np.take(self.prob, flat, out=p, mode='clip')
+        np.greater_equal(u, p, out=reject)
+        np.take(self.alias, flat, out=alias, mode='clip')
+        np.copyto(flat, alias, where=reject)
+        return out
+
+    def sample(self, size, rng=None, out=None, policy=None):
+        """Draw values; ``out`` may be a preallocated array of the values' dtype.
+
+        With ``out``, the indices go to a buffer kept between calls, so
+        repeated draws of the same size allocate nothing.
+        """
+        if out is None:
+            return self.values[self.sample_index(size, rng, policy=policy)]
+        index = self._scratch('index', out.size,
+                              index_dtype(self.p.size, policy))
+        index = index.reshape(out.shape)
+        self.sample_index(out.shape, rng, out=index)
+        np.take(self.values, index, out=out, mode='clip')
+        return out
+
+    def counts(self, n, size=None, rng=None):
+        """Category counts of ``n`` draws, shape ``size + (k,)``.
+
+        Sums and means of the draws follow from the counts alone, e.g.
+        ``counts @ values / n``, without generating the individual draws.
+        """
+        rng = np.random.default_rng(rng)
+        return rng.multinomial(n, self.p, size=size)
+
+    def means(self, n, size, rng=None):
+        """Means of ``size`` samples of ``n`` draws each, via category counts."""
+        return self.counts(n, size, rng) @ self.values / n
+
+
+def _vose(p):
+    k = p.size
+    scaled = p * k
+    prob = np.ones(k)
+    alias = np.arange(k)
+    small = [i for i in range(k) if scaled[i] < 1]
+    large = [i for i in range(k) if scaled[i] >= 1]
+    while small and large:
+        s = small.pop()
+        g = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = g
+        scaled[g] -= 1 - scaled[s]
+        if scaled[g] < 1:
+            small.append(g)
+        else:
+            large.append(g)
+    # leftovers are 1 up to rounding
+    return prob, alias
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+
+    # serie-05/aufgabe5.2.py
+    values = np.array([0, 10, 11])
+    dist = Discrete(values)
+    n = 200
+    start = perf_counter()
+    means = dist.sample((1000, n), rng=1).mean(axis=1)
+    print('alias:       E={:.4f}, σ={:.4f}, {:.4f}s'.format(
+        means.mean(), means.std(), perf_counter() - start))
+    start = perf_counter()
+    means = dist.means(n, 1000, rng=1)
+    print('counts:      E={:.4f}, σ={:.4f}, {:.4f}s'.format(
+        means.mean(), means.std(), perf_counter() - start))
+    start = perf_counter()
+    means = np.random.choice(values, size=(1000, n)).mean(axis=1)
+    print('np.random.choice: E={:.4f}, σ={:.4f}, {:.4f}s'.format(
+        means.mean(), means.std(), perf_counter() - start))
+
+    weighted = Discrete(['a', 'b', 'c'], weights=[0.7, 0.2, 0.1])
+    print(np.unique(weighted.sample(10**5, rng=1), return_counts=True))
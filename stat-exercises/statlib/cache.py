@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Persistent, size-bounded cache for simulation results.
+
+Results are keyed by function, arguments (including the seed) and a code
+version, which defaults to a hash of the function's source, so editing a
+simulation invalidates its old results. Arrays are stored as uncompressed
+``.npz`` files. Writes go to a temporary file that is renamed into place,
+so concurrent worker processes never see partial entries; eviction of the
+least recently used entries is serialized with a lock file.
+
+    cache = ResultCache(max_bytes=2**30)
+
+    @cache.memoize()
+    def simulate(n, m, seed):
+        ...
+"""
+
+import fcntl
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'stat-exercises')
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _canonical(value):
+    """JSON-able stand-in for an argument, used to build cache keys."""
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            raise TypeError('object arrays cannot be cached by content')
+        return {'ndarray': _digest(np.ascontiguousarray(value).tobytes()),
+                'dtype': str(value.dtype), 'shape': list(value.shape)}
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        # the repr is truncated: hash every row, with the index
+        rows = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        meta = {'rows': _digest(rows.tobytes()),
+                'index': [str(value.index.dtype), list(value.index.names)]}
+        if isinstance(value, pd.DataFrame):
+            meta['columns'] = [[str(c), str(t)]
+                               for c, t in value.dtypes.items()]
+        else:
+            meta['series'] = [str(value.name), str(value.dtype)]
+        return meta
+    if isinstance(value, np.random.SeedSequence):
+        return {'entropy': value.entropy, 'spawn_key': list(value.spawn_key)}
+    if hasattr(value, 'record'):  # RandomService
+        return value.record()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, np.random.Generator):
+        raise TypeError('pass a seed instead of a Generator to cached functions')
+    raise TypeError('cannot build a cache key from {}'.format(
+        type(value).__name__))
+
+
+def code_version(func):
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        return ''
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+
+# scalar results come back as the same Python type
+_SCALARS = {'bool': bool, 'int': int, 'float': float, 'complex': complex,
+            'str': str}
+
+_MISSING = object()
+
+
+def _pack_leaf(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            raise TypeError('object arrays cannot be cached')
+        return 'array', value
+    if isinstance(value, np.generic):
+        return 'generic', np.asarray(value)
+    if value is None:
+        return 'none', np.zeros(0)
+    if type(value).__name__ in _SCALARS:
+        return type(value).__name__, np.asarray(value)
+    raise TypeError('cannot cache results of type {}'.format(
+        type(value).__name__))
+
+
+def _unpack_leaf(kind, array):
+    if kind == 'array':
+        return array
+    if kind == 'generic':
+        return array[()]
+    if kind == 'none':
+        return None
+    return _SCALARS[kind](array[()])
+
+
+def _pack(value):
+    if isinstance(value, dict):
+        kind, keys, items = 'dict', list(value), list(value.values())
+        if not all(isinstance(k, str) for k in keys):
+            raise TypeError('cached dicts need string keys')
+    elif isinstance(value, (tuple, list)):
+        kind, keys, items = type(value).__name__, [], list(value)
+    else:
+        kind, keys, items = 'leaf', [], [value]
+    leaves = [_pack_leaf(v) for v in items]
+    meta = {'__kind__': np.array(kind),
+            '__leaves__': np.array([k for k, _ in leaves], dtype=str),
+            '__keys__': np.array(keys, dtype=str)}
+    return meta, {'v_{}'.format(i): a for i, (_, a) in enumerate(leaves)}
+
+
+def _unpack(data):
+    kind = str(data['__kind__'])
+    items = [_unpack_leaf(str(k), data['v_{}'.format(i)])
+             for i, k in enumerate(data['__leaves__'])]
+    if kind == 'dict':
+        return dict(zip((str(k) for k in data['__keys__']), items))
+    if kind == 'tuple':
+        return tuple(items)
+    if kind == 'list':
+        return items
+    return items[0]
+
+
+class ResultCache:
+
+    def __init__(self, directory=None, max_bytes=2**30):
+        self.directory = directory or os.environ.get('STAT_CACHE_DIR',
+                                                     DEFAULT_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, name, version, params):
+        blob = json.dumps({'name': name, 'version': version,
+                           'params': _canonical(params)}, sort_keys=True)
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def get(self, key, default=None):
+        """Return the stored result or ``default``; marks the entry as
+        recently used."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                value = _unpack(data)
+            os.utime(path)
+        except (KeyError, ValueError, OSError):
+            # missing, partial or in an older layout
+            return default
+        return value
+
+    def put(self, key, value):
+        """Store a result: arrays, scalars and None, or a tuple, list or dict
+        of them; anything else raises a TypeError."""
+        meta, arrays = _pack(value)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **meta, **arrays)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def entries(self):
+        """(last use, size, path) of every stored result."""
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.npz'):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            found.append((st.st_atime if st.st_atime > st.st_mtime
+                          else st.st_mtime, st.st_size, entry.path))
+        return found
+
+    def evict(self):
+        """Delete least recently used entries until under ``max_bytes``."""
+        lock_path = os.path.join(self.directory, '.lock')
+        with open(lock_path, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def memoize(self, version=None):
+        """Decorator caching a function's results by its arguments.
+
+        ``version`` overrides the source hash, e.g. to keep results across
+        cosmetic edits or to invalidate them when a helper changes.
+        """
+        def decorate(func):
+            name = '{}.{}'.format(func.__module__, func.__qualname__)
+            sig = inspect.signature(func)
+            ver = code_version(func) if version is None else version
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                bound = sig.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = self.key(name, ver, bound.arguments)
+                value = self.get(key, _MISSING)
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    self.put(key, value)
+                return value
+
+            wrapper.cache = self
+            return wrapper
+        return decorate
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+
+    cache = ResultCache(os.path.join(tempfile.gettempdir(), 'stat-cache-demo'),
+                        max_bytes=2**26)
+
+    # coverage study of serie-07/bootstrapping.py
+    @cache.memoize()
+    def coverage(runs, n, nboot, seed):
+        rng = np.random.default_rng(seed)
+        x = rng.normal(loc=40, scale=5, size=(runs, n))
+        xbar = x.mean(axis=1)
+        lows = np.empty(runs)
+        highs = np.empty(runs)
+        for i in range(runs):
+            idx = rng.integers(0, n, size=(nboot, n))
+            d = np.percentile(x[i][idx].mean(axis=1) - xbar[i], [2.5, 97.5])
+            lows[i], highs[i] = xbar[i] - d[1], xbar[i] - d[0]
+        return lows, highs
+
+    for attempt in ['first call', 'second call']:
+        start = perf_counter()
+        lows, highs = coverage(1000, 100, 1000, seed=1)
+        k = ((lows <= 40) & (40 <= highs)).sum()
+        print('{}: k={:d}, {:.3f}s'.format(attempt, k, perf_counter() - start))
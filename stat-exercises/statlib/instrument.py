@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Per-step timing and memory instrumentation.
+
+    from statlib.instrument import step
+
+    with step('b) bootstrap'):
+        ...
+
+records wall time, CPU time, peak traced memory and the net number of
+allocated memory blocks of the step. Recording is off unless enabled with
+``enable()`` or the ``STAT_PROFILE`` environment variable, which names a
+.json or .csv report file written at exit; while off, a step costs well
+under a microsecond. ``step`` also works as a decorator, also when applied before
+recording is enabled.
+
+Whole exercise scripts can be profiled without editing them, since their
+steps are marked by comments like ``# a)``:
+
+    python3 -m statlib.instrument serie-01/aufgabe1.1.py --report steps.csv
+"""
+
+import atexit
+import csv
+import functools
+import json
+import os
+import re
+import sys
+from time import perf_counter, process_time
+import traceback
+import tracemalloc
+
+FIELDS = ['script', 'step', 'wall', 'cpu', 'peak_bytes', 'blocks']
+
+STEP_MARKER = re.compile(r'^#\s*(?:Step\s+\d+|[a-z](?:/[a-z])*\))')
+
+
+class Recorder:
+
+    def __init__(self):
+        self.enabled = False
+        self.records = []
+        self.script = ''
+        self._stack = []
+        self._tracing = False
+
+    def enable(self, trace_memory=True):
+        self.enabled = True
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def disable(self):
+        self.enabled = False
+        # tracing slows down every allocation, not just those in steps
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def step(self, name):
+        return _Step(self, name)
+
+    def report(self, path):
+        """Write the records as JSON or CSV, depending on the extension."""
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.csv'):
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+            else:
+                json.dump(self.records, f, indent=1)
+
+    def summary(self):
+        lines = ['{:40s} {:>9s} {:>9s} {:>10s} {:>9s}'.format(
+            'step', 'wall [s]', 'cpu [s]', 'peak [MB]', 'blocks')]
+        for r in self.records:
+            lines.append('{:40s} {:9.4f} {:9.4f} {:10.2f} {:9d}'.format(
+                (r['script'] + ': ' if r['script'] else '') + r['step'],
+                r['wall'], r['cpu'], r['peak_bytes'] / 2**20, r['blocks']))
+        return '\n'.join(lines)
+
+
+class _Frame:
+    # the measurements of one entry into a step; a step may be entered again
+    # before it exits, e.g. by recursion, so they are not kept on the step
+
+    __slots__ = ('name', 'peak', 'base', 'blocks', 'cpu', 'wall')
+
+
+class _Step:
+    """Context manager and decorator; whether it records is decided anew on
+    every entry, so it may be created before the recorder is enabled."""
+
+    __slots__ = ('recorder', 'name')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.recorder.enabled:
+                return func(*args, **kwargs)
+            with self:
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        stack = self.recorder._stack
+        if not self.recorder.enabled:
+            stack.append(None)
+            return self
+        frame = _Frame()
+        frame.name = self.name
+        frame.peak = 0
+        frame.base = 0
+        if tracemalloc.is_tracing():
+            # tracemalloc has a single peak: hand the enclosing step the
+            # peak so far before resetting it, and the inner peak on exit
+            current, peak = tracemalloc.get_traced_memory()
+            outer = _enclosing(stack)
+            if outer is not None:
+                outer.peak = max(outer.peak, peak)
+            tracemalloc.reset_peak()
+            frame.base = current
+        stack.append(frame)
+        frame.blocks = sys.getallocatedblocks()
+        frame.cpu = process_time()
+        frame.wall = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        frame = self.recorder._stack.pop()
+        if frame is None:
+            return False
+        wall = perf_counter()
+        cpu = process_time()
+        blocks = sys.getallocatedblocks()
+        stack = self.recorder._stack
+        peak = 0
+        if tracemalloc.is_tracing():
+            frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            peak = max(frame.peak - frame.base, 0)
+            outer = _enclosing(stack)
+            if outer is not None:
+                outer.peak = max(outer.peak, frame.peak)
+        self.recorder.records.append({
+            'script': self.recorder.script, 'step': frame.name,
+            'wall': wall - frame.wall, 'cpu': cpu - frame.cpu,
+            'peak_bytes': peak, 'blocks': blocks - frame.blocks})
+        return False
+
+
+def _enclosing(stack):
+    for frame in reversed(stack):
+        if frame is not None:
+            return frame
+    return None
+
+
+recorder = Recorder()
+step = recorder.step
+enable = recorder.enable
+disable = recorder.disable
+
+
+def split_steps(source):
+    """Split a script into (name, code) chunks at its step comments."""
+    chunks = [['setup', []]]
+    for line in source.splitlines(keepends=True):
+        match = STEP_MARKER.match(line)
+        if match:
+            chunks.append([match.group(0).lstrip('#').strip(), []])
+        chunks[-1][1].append(line)
+    return [(name, ''.join(lines)) for name, lines in chunks
+            if ''.join(lines).strip()]
+
+
+def run_script(path, rec=None, only=None):
+    """Execute a script step by step in its own directory, recording each.
+
+    ``only`` names the steps to run, e.g. ``['b)']``; the setup before the
+    first step, with the imports and data loading, always runs. Steps using
+    variables of earlier steps need those listed too.
+    """
+    rec = rec or recorder
+    path = os.path.abspath(path)
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    steps = split_steps(source)
+    if only is not None:
+        only = [only] if isinstance(only, str) else list(only)
+        unknown = set(only) - {name for name, _ in steps}
+        if unknown:
+            raise ValueError('unknown step: {}'.format(
+                ', '.join(sorted(unknown))))
+    namespace = {'__name__': '__main__', '__file__': path}
+    cwd = os.getcwd()
+    rec.script = os.path.basename(path)
+    os.chdir(os.path.dirname(path))
+    sys.path.insert(0, os.path.dirname(path))
+    try:
+        offset = 0
+        for name, code in steps:
+            # pad with newlines so tracebacks show the script's line numbers
+            compiled = compile('\n' * offset + code, path, 'exec')
+            offset += code.count('\n')
+            if only is not None and name != 'setup' and name not in only:
+                continue
+            with rec.step(name):
+                exec(compiled, namespace)
+    finally:
+        sys.path.remove(os.path.dirname(path))
+        os.chdir(cwd)
+        rec.script = ''
+    return rec
+
+
+def _report_at_exit():
+    path = os.environ.get('STAT_PROFILE')
+    if path and recorder.records:
+        recorder.report(path)
+
+
+if os.environ.get('STAT_PROFILE'):
+    enable()
+    atexit.register(_report_at_exit)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Run exercise scripts and profile their steps.')
+    parser.add_argument('scripts', nargs='+')
+    parser.add_argument('--report', help='.json or .csv file for the records')
+    parser.add_argument('--no-memory', action='store_true',
+                        help="don't trace memory (faster)")
+    args = parser.parse_args(argv)
+
+    # plots would block on plt.show()
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    enable(trace_memory=not args.no_memory)
+    status = 0
+    for script in args.scripts:
+        try:
+            run_script(script)
+        except Exception:
+            # the failing step is recorded too; go on with the next script
+            traceback.print_exc()
+            status = 1
+    print(recorder.summary(), file=sys.stderr)
+    if args.report:
+        recorder.report(args.report)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Lazy, chunked evaluation of derived columns, filters and aggregates.
+
+A plan is recorded with ``with_column``, ``filter`` and ``select`` and only
+executed by ``collect`` or ``agg``, in a single pass over the data chunk by
+chunk. String expressions are evaluated with ``DataFrame.eval``, which uses
+numexpr when it is installed; columns with dots in their names must be quoted
+with backticks, and ``@name`` refers to the keyword arguments passed along
+with the expression.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _chunked(df, chunksize):
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start+chunksize]
+
+
+class _Moments:
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        n = values.size
+        if n == 0:
+            return
+        mean = values.mean()
+        m2 = ((values - mean)**2).sum()
+        # Chan et al. pairwise combination of mean and sum of squares
+        delta = mean - self.mean
+        total_n = self.n + n
+        self.mean += delta * n / total_n
+        self.m2 += m2 + delta**2 * self.n * n / total_n
+        self.n = total_n
+        self.total += values.sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+    def get(self, func):
+        if func == 'count':
+            return self.n
+        if func == 'sum':
+            return self.total
+        if self.n == 0:
+            return np.nan
+        if func == 'mean':
+            return self.mean
+        if func == 'min':
+            return self.min
+        if func == 'max':
+            return self.max
+        if func == 'var':
+            return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+        if func == 'std':
+            return np.sqrt(self.get('var'))
+        raise ValueError('unknown aggregate: {}'.format(func))
+
+
+class Lazy:
+    """A deferred computation over a DataFrame or a source of chunks.
+
+    ``source`` is either a DataFrame, which is processed in slices of
+    ``chunksize`` rows, or a callable returning a fresh iterable of chunks,
+    e.g. ``lambda: pd.read_csv('fuel.csv', index_col=0, chunksize=10000)``.
+    """
+
+    def __init__(self, source, chunksize=100000, _plan=()):
+        self.source = source
+        self.chunksize = chunksize
+        self._plan = _plan
+
+    def _then(self, step):
+        return Lazy(self.source, self.chunksize, self._plan + (step,))
+
+    def with_column(self, name, expr, **params):
+        """Add a derived column, given as expression string or callable."""
+        return self._then(('column', name, expr, params))
+
+    def filter(self, expr, **params):
+        """Keep only the rows for which the boolean expression holds."""
+        return self._then(('filter', None, expr, params))
+
+    def select(self, *columns):
+        return self._then(('select', columns, None, None))
+
+    def _chunks(self):
+        if isinstance(self.source, pd.DataFrame):
+            return _chunked(self.source, self.chunksize)
+        return self.source()
+
+    def _run(self):
+        """Yield (chunk, derived columns, row mask, selected columns)."""
+        for chunk in self._chunks():
+            derived = {}
+            mask = None
+            columns = None
+            for kind, name, expr, params in self._plan:
+                if kind == 'select':
+                    columns = list(name)
+                    continue
+                if callable(expr):
+                    view = chunk.assign(**derived) if derived else chunk
+                    value = expr(view)
+                else:
+                    value = chunk.eval(expr, local_dict=params,
+                                       resolvers=(derived,))
+                value = np.asarray(value)
+                if kind == 'column':
+                    derived[name] = value
+                else:
+                    mask = value if mask is None else mask & value
+            yield chunk, derived, mask, columns
+
+    def collect(self):
+        """Execute the plan and return the resulting DataFrame."""
+        parts = []
+        for chunk, derived, mask, columns in self._run():
+            if columns is None:
+                columns = list(chunk.columns) + list(derived)
+            index = chunk.index if mask is None else chunk.index[mask]
+            data = {}
+            for c in columns:
+                values = derived[c] if c in derived else chunk[c].to_numpy()
+                data[c] = values if mask is None else values[mask]
+            parts.append(pd.DataFrame(data, index=index, columns=columns))
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts)
+
+    def agg(self, **named):
+        """Execute the plan, reducing it to named aggregates.
+
+        Each keyword maps a result name to a ``(column, func)`` pair with func
+        one of count, sum, mean, min, max, var and std. Only the running
+        moments are kept, so no filtered or derived column is materialized.
+        """
+        moments = {column: _Moments() for column, _ in named.values()}
+        for chunk, derived, mask, _ in self._run():
+            for c, acc in moments.items():
+                values = derived[c] if c in derived else chunk[c].to_numpy()
+                values = np.asarray(values, dtype=float)
+                acc.update(values if mask is None else values[mask])
+        return pd.Series({name: moments[c].get(func)
+                          for name, (c, func) in named.items()})
+
+
+if __name__ == '__main__':
+    # unit conversions of serie-01/aufgabe1.2.py
+    fuel = pd.read_csv('serie-01/fuel.csv', index_col=0)
+    l_per_gallon = 3.7891
+    km_per_mile = 1.6093
+    kilograms_per_pound = 0.45359
+    plan = (Lazy(fuel)
+            .with_column('kml', 'mpg * @f', f=km_per_mile/l_per_gallon)
+            .with_column('kg', 'weight * @f', f=kilograms_per_pound))
+    print(plan.agg(kml=('kml', 'mean'), kg=('kg', 'mean')))
+
+    # under-average physical activity of serie-01/aufgabe1.1.py
+    child = Lazy(lambda: pd.read_csv('serie-01/child.csv', index_col=0,
+                                     chunksize=10))
+    col = 'Physical.activity'
+    mean = child.agg(m=(col, 'mean'))['m']
+    low = child.filter('`Physical.activity` < @m', m=mean).select(col)
+    print(low.collect().sort_values(by=col))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Monte Carlo estimators with quasi-random and variance-reduction modes.
+
+An integrand maps an ``(n, dim)`` array of points in the unit cube to ``n``
+values; ``estimate`` returns the mean over the cube together with a standard
+error. Methods:
+
+- ``random``: plain pseudo-random uniforms, error O(1/sqrt(n))
+- ``antithetic``: pairs u and 1-u, cancelling odd parts of the integrand
+- ``sobol`` and ``halton``: scrambled low-discrepancy sequences; the error is
+  estimated from ``replicates`` independent scramblings
+
+Any method can be combined with a control variate ``(g, mean_g)``, where g is
+an integrand with known mean, correlated with f.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+from scipy.stats import qmc
+
+Estimate = namedtuple('Estimate', ['value', 'stderr', 'n', 'method'])
+
+METHODS = ('random', 'antithetic', 'sobol', 'halton')
+
+
+def points(method, n, dim, rng):
+    """Return ``n`` points in the unit cube of dimension ``dim``.
+
+    ``antithetic`` rounds an odd ``n`` up, so that every u has its 1-u: the
+    first half of the points are the u, the second half their 1-u.
+    """
+    if method == 'random':
+        return rng.random((n, dim))
+    if method == 'antithetic':
+        half = rng.random(((n + 1) // 2, dim))
+        return np.concatenate([half, 1 - half])
+    if method == 'sobol':
+        # balance properties only hold for powers of two
+        m = max(int(np.ceil(np.log2(n))), 0)
+        return qmc.Sobol(dim, scramble=True, seed=rng).random_base2(m)[:n]
+    if method == 'halton':
+        return qmc.Halton(dim, scramble=True, seed=rng).random(n)
+    raise ValueError('unknown method: {}'.format(method))
+
+
+def _apply_control(fx, gx, mean_g):
+    cov = np.cov(fx, gx)
+    beta = cov[0, 1] / cov[1, 1] if cov[1, 1] > 0 else 0.0
+    return fx - beta * (gx - mean_g)
+
+
+def _single(f, dim, n, method, control, rng):
+    u = points(method, n, dim, rng)
+    fx = np.asarray(f(u), dtype=float)
+    if control is not None:
+        g, mean_g = control
+        fx = _apply_control(fx, np.asarray(g(u), dtype=float), mean_g)
+    return fx
+
+
+def estimate(f, dim, n, method='random', control=None, replicates=8,
+             seed=None):
+    """Estimate the mean of ``f`` over the unit cube with ``n`` points.
+
+    For the quasi-random methods the ``n`` points are split into
+    ``replicates`` independently scrambled sequences, and the standard error
+    is taken from the spread of their means.
+    """
+    rng = np.random.default_rng(seed)
+    if method in ('sobol', 'halton'):
+        size = max(n // replicates, 1)
+        means = np.array([_single(f, dim, size, method, control, rng).mean()
+                          for _ in range(replicates)])
+        stderr = means.std(ddof=1) / np.sqrt(replicates)
+        return Estimate(means.mean(), stderr, size * replicates, method)
+
+    fx = _single(f, dim, n, method, control, rng)
+    if method == 'antithetic':
+        # pairs are dependent: the error comes from the pair means
+        half = fx.size // 2
+        pairs = (fx[:half] + fx[half:]) / 2
+        stderr = pairs.std(ddof=1) / np.sqrt(half)
+    else:
+        stderr = fx.std(ddof=1) / np.sqrt(n)
+    return Estimate(fx.mean(), stderr, fx.size, method)
+
+
+def pi_integrand(u):
+    """4 times the indicator of the unit disc, on the square [-1, 1]²."""
+    x = 2 * u[:, 0] - 1
+    y = 2 * u[:, 1] - 1
+    return 4.0 * (x*x + y*y <= 1)
+
+
+def pi_control(u):
+    """x² + y² on [-1, 1]², with known mean 2/3."""
+    x = 2 * u[:, 0] - 1
+    y = 2 * u[:, 1] - 1
+    return x*x + y*y
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+
+    # serie-03/aufgabe3.7.py: estimating pi from points in the square
+    sizes = [2**10, 2**14, 2**18, 2**20]
+    variants = [(m, None) for m in METHODS] + [('random', (pi_control, 2/3))]
+    for method, control in variants:
+        name = method + ('+cv' if control else '')
+        for size in sizes:
+            start = perf_counter()
+            est = estimate(pi_integrand, 2, size, method=method,
+                           control=control, seed=1)
+            elapsed = perf_counter() - start
+            print('{:14s} n = {:8d}, Pi = {:.6f}, error = {:.2e}, '
+                  'stderr = {:.2e}, {:.4f}s'.format(
+                      name, est.n, est.value, abs(est.value - np.pi),
+                      est.stderr, elapsed))
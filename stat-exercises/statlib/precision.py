@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Precision policies for simulations and bootstraps.
+
+``DOUBLE`` is the NumPy default. ``SINGLE`` generates and stores variates
+in float32, halving memory traffic, but reduces means and variances with
+float64 accumulators, and stores resample indices in the smallest unsigned
+integer type that can hold them. Functions taking a ``policy`` argument
+accept a ``Policy``, its name or None for ``DOUBLE``.
+
+On the same resamples, ``SINGLE`` bootstrap interval endpoints agree with
+``DOUBLE`` to a relative ``SINGLE_RTOL``; the demo checks this for every
+interval method. Most of the loss is rounding the data to float32, which
+matters most for variances of data whose mean is large against their
+spread.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+Policy = namedtuple('Policy', ['name', 'dtype', 'accumulator', 'compact_index'])
+
+DOUBLE = Policy('double', np.float64, np.float64, False)
+SINGLE = Policy('single', np.float32, np.float64, True)
+
+POLICIES = {'double': DOUBLE, 'single': SINGLE}
+
+SINGLE_RTOL = 1e-4
+
+
+def get_policy(policy=None):
+    if policy is None:
+        return DOUBLE
+    if not isinstance(policy, str):
+        return policy
+    try:
+        return POLICIES[policy]
+    except KeyError:
+        raise ValueError('unknown precision policy: {}'.format(policy)) from None
+
+
+def index_dtype(n, policy=None):
+    """Integer type for indices into an array of length ``n``."""
+    if not get_policy(policy).compact_index:
+        return np.intp
+    for t in (np.uint8, np.uint16, np.uint32):
+        if n - 1 <= np.iinfo(t).max:
+            return t
+    return np.intp
+
+
+def mean(a, axis=None, policy=None):
+    """Mean accumulated in the policy's accumulator, stored in its dtype."""
+    p = get_policy(policy)
+    return a.mean(axis=axis, dtype=p.accumulator).astype(p.dtype, copy=False)
+
+
+def var(a, axis=None, ddof=1, policy=None):
+    p = get_policy(policy)
+    return a.var(axis=axis, ddof=ddof,
+                 dtype=p.accumulator).astype(p.dtype, copy=False)
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+
+    from statlib import bootstrap
+    from statlib.rng import RandomService
+
+    def timed(f):
+        start = perf_counter()
+        result = f()
+        return result, perf_counter() - start
+
+    # CLT simulation of serie-04/aufgabe4.2.py, with many more repetitions
+    n, m = 100, 100000
+    for policy in [DOUBLE, SINGLE]:
+        buffered = RandomService(seed=1).buffered('clt', chunk=n*m,
+                                                  policy=policy)
+        sim, t_gen = timed(lambda: buffered.normal((m, n)))
+        means, t_mean = timed(lambda: mean(sim, axis=1, policy=policy))
+        sd = means.std(dtype=np.float64)
+        print('{:6s}: {:6.1f} MB, generate {:.3f}s, reduce {:.3f}s, '
+              'σ(mean)={:.5f} (theory {:.5f})'.format(
+                  policy.name, sim.nbytes / 2**20, t_gen, t_mean, sd,
+                  1 / np.sqrt(n)))
+
+    # accuracy loss: the float32 means must agree with float64 to ~1e-6
+    z = np.random.default_rng(2).standard_normal((1000, 1000))
+    err = np.abs(mean(z.astype(np.float32), axis=1, policy=SINGLE)
+                 - z.mean(axis=1)).max()
+    print('max |mean32 - mean64| = {:.2e}'.format(err))
+    assert err < 1e-6
+
+    # accuracy loss of the bootstrap intervals: both policies on the same
+    # compact resample indices, which must index like np.intp ones
+    rng = np.random.default_rng(3)
+    samples = {'serie-07': np.array([30, 37, 36, 43, 42, 43, 43, 46, 41, 42]),
+               'counts': rng.integers(0, 5, size=50),
+               'normal(1000, 1)': rng.normal(1000, 1, size=300),
+               'lognormal': rng.lognormal(size=1000)}
+    worst = 0.0
+    for name, x in samples.items():
+        index = bootstrap.resample_index(x.size, 20000, rng, policy=SINGLE)
+        assert index.dtype == index_dtype(x.size, SINGLE) != np.intp
+        assert index.max() < x.size
+        for stat, method in [('mean', 'normal'), ('mean', 'percentile'),
+                             ('mean', 'basic'), ('mean', 'bca'),
+                             ('mean', 'studentized'), ('var', 'normal'),
+                             ('var', 'percentile'), ('var', 'basic'),
+                             ('var', 'bca')]:
+            ci = {p.name: bootstrap.interval(x, stat, method, index=index,
+                                             policy=p)
+                  for p in [DOUBLE, SINGLE]}
+            wide = bootstrap.interval(x, stat, method,
+                                      index=index.astype(np.intp))
+            assert wide == ci['double']
+            err = max(abs(ci['single'].low / ci['double'].low - 1),
+                      abs(ci['single'].high / ci['double'].high - 1))
+            worst = max(worst, err)
+            assert err < SINGLE_RTOL, (name, stat, method, err)
+    print('max relative interval error single/double = {:.2e}'.format(worst))
+
+    # bootstrap of serie-07/bootstrapping.py
+    x = np.array([30, 37, 36, 43, 42, 43, 43, 46, 41, 42])
+    for policy in [DOUBLE, SINGLE]:
+        rng = np.random.default_rng(1)
+        index = bootstrap.resample_index(x.size, 10**6, rng, policy=policy)
+        ci, t_ci = timed(lambda: bootstrap.interval(x, nboot=10**6, rng=1,
+                                                   policy=policy))
+        print('{:6s}: index {:6.1f} MB, bca ({:.3f}, {:.3f}), {:.3f}s'.format(
+            policy.name, index.nbytes / 2**20, ci.low, ci.high, t_ci))
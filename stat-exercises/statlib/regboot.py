@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Bootstrap of simple linear regression without refitting each replicate.
+
+A pairs resample is a vector of multinomial counts w, so every replicate fit
+only needs the weighted sums Σw, Σwx, Σwy, Σwx², Σwy² and Σwxy. A chunk of
+replicates is then a single matrix product of the count matrix with the
+per-point terms. Residual resampling is linear in the residuals as well.
+Chunks are spread across a process pool.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+
+from statlib.bootstrap import percentile_interval
+from statlib.rng import as_seed_sequence
+
+Fit = namedtuple('Fit', ['slope', 'intercept', 'r'])
+RegressionBootstrap = namedtuple('RegressionBootstrap',
+                                 ['fit', 'slope', 'intercept', 'r', 'ci'])
+
+
+def fit(x, y):
+    """Least-squares line and correlation, like ``np.polyfit(x, y, 1)``."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    xc = x - x.mean()
+    yc = y - y.mean()
+    sxx = (xc * xc).sum()
+    slope = (xc * yc).sum() / sxx
+    r = (xc * yc).sum() / np.sqrt(sxx * (yc * yc).sum())
+    return Fit(slope, y.mean() - slope * x.mean(), r)
+
+
+def _from_sums(w, wx, wy, wxx, wyy, wxy):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx = wxx - wx * wx / w
+        syy = wyy - wy * wy / w
+        sxy = wxy - wx * wy / w
+        slope = sxy / sxx
+        intercept = (wy - slope * wx) / w
+        r = sxy / np.sqrt(sxx * syy)
+    return slope, intercept, r
+
+
+def _pairs_chunk(args):
+    x, y, size, seed = args
+    rng = np.random.default_rng(seed)
+    n = x.size
+    counts = rng.multinomial(n, np.full(n, 1 / n), size=size).astype(float)
+    terms = np.column_stack([x, y, x * x, y * y, x * y])
+    wx, wy, wxx, wyy, wxy = (counts @ terms).T
+    return _from_sums(n, wx, wy, wxx, wyy, wxy)
+
+
+def _residual_chunk(args):
+    x, y, size, seed = args
+    rng = np.random.default_rng(seed)
+    n = x.size
+    base = fit(x, y)
+    xc = x - x.mean()
+    sxx = (xc * xc).sum()
+    e = y - (base.intercept + base.slope * x)
+    estar = e[rng.integers(0, n, size=(size, n))]
+    # y* = yhat + e*, so the fitted coefficients shift linearly in e*
+    slope = base.slope + estar @ xc / sxx
+    intercept = base.intercept + estar.mean(axis=1) - (slope - base.slope) * x.mean()
+    ystar = base.intercept + base.slope * x + estar
+    yc = ystar - ystar.mean(axis=1, keepdims=True)
+    r = yc @ xc / np.sqrt(sxx * (yc * yc).sum(axis=1))
+    return slope, intercept, r
+
+
+def bootstrap(x, y, nboot=10000, method='pairs', alpha=0.05, chunk=2000,
+              workers=None, seed=None):
+    """Bootstrap replicates and percentile intervals of slope, intercept, r.
+
+    ``method`` is ``pairs`` (resample (x, y) points) or ``residuals``
+    (resample residuals around the fitted line, keeping x fixed).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # shifting to the means keeps the sums well conditioned; undone below
+    mx, my = x.mean(), y.mean()
+    xs, ys = x - mx, y - my
+    if method == 'pairs':
+        task = _pairs_chunk
+    elif method == 'residuals':
+        task = _residual_chunk
+    else:
+        raise ValueError('unknown method: {}'.format(method))
+
+    sizes = [min(chunk, nboot - i) for i in range(0, nboot, chunk)]
+    seeds = as_seed_sequence(seed).spawn(len(sizes))
+    jobs = [(xs, ys, s, sd) for s, sd in zip(sizes, seeds)]
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            parts = list(executor.map(task, jobs))
+    else:
+        parts = list(map(task, jobs))
+
+    slope = np.concatenate([p[0] for p in parts])
+    intercept = np.concatenate([p[1] for p in parts]) + my - slope * mx
+    r = np.concatenate([p[2] for p in parts])
+    ci = {name: percentile_interval(reps[np.isfinite(reps)], alpha)
+          for name, reps in [('slope', slope), ('intercept', intercept),
+                             ('r', r)]}
+    return RegressionBootstrap(fit(x, y), slope, intercept, r, ci)
+
+
+if __name__ == '__main__':
+    import pandas as pd
+    from time import perf_counter
+
+    # serie-02/aufgabe2.4.py
+    hubble = pd.read_table('serie-02/hubble.txt', sep=' ')
+    x, y = hubble['distance'], hubble['recession.velocity']
+    start = perf_counter()
+    res = bootstrap(x, y, nboot=100000, seed=1)
+    print('Hubble: y = {:.2f} + {:.2f}x, r={:.3f} ({:.3f}s)'.format(
+        res.fit.intercept, res.fit.slope, res.fit.r, perf_counter() - start))
+    for name, ci in res.ci.items():
+        print('  {:9s} ({:.3f}, {:.3f})'.format(name, ci.low, ci.high))
+
+    start = perf_counter()
+    slopes = []
+    rng = np.random.default_rng(1)
+    for _ in range(10000):
+        i = rng.integers(0, x.size, x.size)
+        slopes.append(np.polyfit(x.to_numpy()[i], y.to_numpy()[i], deg=1)[0])
+    print('10000 polyfit refits: {:.3f}s'.format(perf_counter() - start))
+
+    # serie-02/aufgabe2.5.py
+    income = pd.read_table('serie-02/income.txt', sep=' ')
+    for col in ['Educ', 'AFQT']:
+        res = bootstrap(income[col], income['Income2005'], seed=1)
+        print('{}: slope {:.1f} ({:.1f}, {:.1f}), r {:.3f} ({:.3f}, {:.3f})'
+              .format(col, res.fit.slope, res.ci['slope'].low,
+                      res.ci['slope'].high, res.fit.r, res.ci['r'].low,
+                      res.ci['r'].high))
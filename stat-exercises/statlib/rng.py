@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Central seeded random streams.
+
+``RandomService`` replaces global ``np.random.seed`` calls: every simulation
+stage asks for a named stream, every worker for a spawned substream, and
+all of them derive reproducibly from one root seed, which ``record`` reports
+for storing alongside results.
+
+    service = RandomService(seed=1)
+    rng = service.stream('bootstrap')
+    workers = service.spawn(4)
+"""
+
+import hashlib
+
+import numpy as np
+
+from statlib.precision import get_policy
+
+BIT_GENERATORS = {
+    'PCG64': np.random.PCG64,
+    'PCG64DXSM': np.random.PCG64DXSM,
+    'SFC64': np.random.SFC64,
+    'Philox': np.random.Philox,
+}
+
+
+def as_seed_sequence(seed=None):
+    """Accept an int, None or an existing SeedSequence."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def _name_key(name):
+    digest = hashlib.sha256(name.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+class RandomService:
+    """Hands out independent, reproducible random generators.
+
+    Streams obtained by name don't depend on the order in which they are
+    requested; ``spawn`` hands out fresh substreams in sequence, e.g. one
+    per worker process.
+    """
+
+    def __init__(self, seed=None, bit_generator='PCG64'):
+        if bit_generator not in BIT_GENERATORS:
+            raise ValueError('unknown bit generator: {}'.format(bit_generator))
+        self.root = as_seed_sequence(seed)
+        self.bit_generator = bit_generator
+        self._spawned = 0
+
+    @property
+    def seed(self):
+        return self.root.entropy
+
+    def generator(self, seed_sequence):
+        return np.random.Generator(BIT_GENERATORS[self.bit_generator](seed_sequence))
+
+    def seed_sequence(self, name):
+        """SeedSequence of the stream ``name``, e.g. to pass to a worker."""
+        return np.random.SeedSequence(
+            self.root.entropy,
+            spawn_key=self.root.spawn_key + (_name_key(name),))
+
+    def stream(self, name):
+        return self.generator(self.seed_sequence(name))
+
+    def spawn(self, n):
+        """``n`` new independent generators, distinct from earlier ones."""
+        seqs = self.root.spawn(n)
+        self._spawned += n
+        return [self.generator(s) for s in seqs]
+
+    def spawn_seeds(self, n):
+        """Like ``spawn``, but returns the picklable SeedSequences."""
+        seqs = self.root.spawn(n)
+        self._spawned += n
+        return seqs
+
+    def buffered(self, name, chunk=65536, policy=None):
+        return Buffered(self.stream(name), chunk, policy)
+
+    def record(self):
+        """Everything needed to reproduce the streams handed out so far."""
+        return {
+            'seed': self.root.entropy,
+            'spawn_key': list(self.root.spawn_key),
+            'bit_generator': self.bit_generator,
+            'spawned': self._spawned,
+        }
+
+    @classmethod
+    def from_record(cls, record):
+        seq = np.random.SeedSequence(record['seed'],
+                                     spawn_key=tuple(record['spawn_key']))
+        service = cls(seq, record['bit_generator'])
+        # skip the substreams spawned before, so new ones don't repeat them
+        if record['spawned']:
+            service.root.spawn(record['spawned'])
+            service._spawned = record['spawned']
+        return service
+
+
+class Buffered:
+    """Draws variates in large chunks and serves them in small pieces.
+
+    Small repeated requests, like ``st.norm.rvs(size=n)`` in a loop, then
+    cost one slice each instead of a generator call plus scipy's argument
+    handling. Each distribution (and parameter) has its own buffer, so the
+    sequence of values is reproducible for a fixed request pattern.
+
+    Values are stored in the dtype of the precision ``policy``; uniforms and
+    normals are generated in float32 directly under the ``single`` policy.
+    """
+
+    def __init__(self, rng, chunk=65536, policy=None):
+        self.rng = rng
+        self.chunk = chunk
+        self.dtype = get_policy(policy).dtype
+        self._buffers = {}
+
+    def _take(self, key, draw, size):
+        n = int(np.prod(size))
+        buf, pos = self._buffers.get(key, (np.empty(0, self.dtype), 0))
+        if buf.size - pos < n:
+            fresh = draw(max(self.chunk, n)).astype(self.dtype, copy=False)
+            buf = np.concatenate([buf[pos:], fresh])
+            pos = 0
+        self._buffers[key] = (buf, pos + n)
+        return buf[pos:pos+n].reshape(size)
+
+    def uniform(self, size, low=0.0, high=1.0):
+        u = self._take(('uniform',),
+                       lambda n: self.rng.random(n, dtype=self.dtype), size)
+        if low == 0.0 and high == 1.0:
+            return u
+        return low + (high - low) * u
+
+    def normal(self, size, loc=0.0, scale=1.0):
+        z = self._take(('normal',),
+                       lambda n: self.rng.standard_normal(n, dtype=self.dtype),
+                       size)
+        if loc == 0.0 and scale == 1.0:
+            return z
+        return loc + scale * z
+
+    def t(self, df, size):
+        return self._take(('t', df),
+                          lambda n: self.rng.standard_t(df, n), size)
+
+    def chi2(self, df, size):
+        return self._take(('chi2', df),
+                          lambda n: self.rng.chisquare(df, n), size)
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+    import scipy.stats as st
+
+    service = RandomService(seed=1)
+    print(service.record())
+    print(service.stream('bootstrap').random(3))
+    print(RandomService(seed=1).stream('bootstrap').random(3))
+
+    # the sampling pattern of serie-05/aufgabe5.1.py, repeated
+    start = perf_counter()
+    for _ in range(2000):
+        for n in [10, 20, 50, 100]:
+            st.norm.rvs(size=n)
+            st.t.rvs(size=n, df=7)
+    print('scipy rvs: {:.3f}s'.format(perf_counter() - start))
+    buffered = service.buffered('serie-05')
+    start = perf_counter()
+    for _ in range(2000):
+        for n in [10, 20, 50, 100]:
+            buffered.normal(n)
+            buffered.t(7, n)
+    print('buffered:  {:.3f}s'.format(perf_counter() - start))
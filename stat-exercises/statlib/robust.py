@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Robust line fits: Theil–Sen, Siegel repeated medians and Huber IRLS.
+
+``theil_sen`` selects the median of all pairwise slopes without listing
+them: the number of slopes ≤ t equals the number of inversions of
+y - t·x in x order, which is counted in O(n log² n). A bracket around the
+median slope is taken from a random sample of pairs and narrowed until at
+most n slopes remain inside, which are then listed exactly.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+Line = namedtuple('Line', ['slope', 'intercept'])
+
+# relative offset of the theil_sen bracket ends from sampled slopes
+_EPS = 1e-9
+
+
+def _pair_slopes(x, y):
+    i, j = np.triu_indices(x.size, k=1)
+    dx = x[j] - x[i]
+    ok = dx != 0
+    return (y[j] - y[i])[ok] / dx[ok]
+
+
+def theil_sen_naive(x, y):
+    """Theil–Sen from all O(n²) pairwise slopes, for reference."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    slope = np.median(_pair_slopes(x, y))
+    return Line(slope, np.median(y - slope * x))
+
+
+def _count_inversions(r):
+    """Number of pairs i < j with r[j] <= r[i], for integer ranks r."""
+    n = r.size
+    idx = np.arange(n)
+    total = 0
+    w = 1
+    while w < n:
+        block = idx // w
+        left = block % 2 == 0
+        pair = block // 2
+        keys = np.sort(pair[left] * n + r[left])
+        p_right = pair[~left]
+        query = p_right * n + r[~left]
+        # left elements of the same pair that are >= the right element
+        total += int((np.searchsorted(keys, (p_right + 1) * n)
+                      - np.searchsorted(keys, query)).sum())
+        w *= 2
+    return total
+
+
+class _SlopeCounter:
+
+    def __init__(self, x, y):
+        # within equal x, descending y makes every tied pair count as an
+        # inversion whatever t is, so they can be subtracted as a constant
+        order = np.lexsort((-y, x))
+        # centring leaves the slopes unchanged and keeps y - t·x small
+        self.x = x[order] - x.mean()
+        self.y = y[order] - y.mean()
+        _, sizes = np.unique(self.x, return_counts=True)
+        self.ties = int((sizes * (sizes - 1) // 2).sum())
+        n = x.size
+        self.total = n * (n - 1) // 2 - self.ties
+
+    def count_le(self, t):
+        """Number of pairwise slopes <= t."""
+        v = self.y - t * self.x
+        r = np.unique(v, return_inverse=True)[1].ravel()
+        return _count_inversions(r) - self.ties
+
+    def slopes_between(self, lo, hi):
+        """Sorted pairwise slopes in (lo, hi].
+
+        These are exactly the pairs whose order by y - t·x changes between
+        t = lo and t = hi, so sorting the lo order by adjacent swaps under
+        the hi key visits each of them once.
+        """
+        order = np.lexsort((-self.x, self.y - lo * self.x))
+        x = self.x[order]
+        y = self.y[order]
+        key = y - hi * x
+        found = []
+        swapped = True
+        while swapped:
+            swapped = False
+            for start in (0, 1):
+                i = np.arange(start, x.size - 1, 2)
+                # ties go to the larger x first, as in the lo order
+                later = (key[i] > key[i + 1]) | \
+                    ((key[i] == key[i + 1]) & (x[i] < x[i + 1]))
+                i = i[later]
+                if i.size == 0:
+                    continue
+                swapped = True
+                found.append((y[i + 1] - y[i]) / (x[i + 1] - x[i]))
+                for arr in (x, y, key):
+                    arr[i], arr[i + 1] = arr[i + 1], arr[i].copy()
+        if not found:
+            return np.array([])
+        return np.sort(np.concatenate(found))
+
+
+def _select(counter, x, y, k, rng, sample=None):
+    """The k-th smallest (0-based) pairwise slope."""
+    n = x.size
+    sample = sample or max(4 * n, 1000)
+    i = rng.integers(0, n, sample)
+    j = rng.integers(0, n, sample)
+    dx = x[j] - x[i]
+    ok = dx != 0
+    s = np.sort((y[j] - y[i])[ok] / dx[ok])
+    if s.size == 0:
+        s = np.array([-1.0, 1.0])
+
+    # bracket the target rank with a margin of a few standard deviations;
+    # the ends are moved slightly off the sampled slopes, where rounding in
+    # y - t·x could flip the comparison of the pair with that slope
+    q = (k + 0.5) / counter.total
+    margin = 3 * np.sqrt(q * (1 - q) / s.size) + 1 / s.size
+    lo = s[int(max(q - margin, 0) * (s.size - 1))]
+    hi = s[int(min(q + margin, 1) * (s.size - 1))]
+    lo -= _EPS * (abs(lo) + 1)
+    hi += _EPS * (abs(hi) + 1)
+    while counter.count_le(lo) > k:
+        lo -= max(hi - lo, abs(lo), 1.0)
+    while counter.count_le(hi) <= k:
+        hi += max(hi - lo, abs(hi), 1.0)
+
+    # invariant: count_le(lo) <= k < count_le(hi); narrow the bracket,
+    # alternating interpolation of the counts with bisection, until few
+    # enough slopes remain inside to list them
+    c_lo = counter.count_le(lo)
+    c_hi = counter.count_le(hi)
+    step = 0
+    while c_hi - c_lo > n:
+        frac = (k + 0.5 - c_lo) / (c_hi - c_lo) if step % 2 == 0 else 0.5
+        mid = lo + np.clip(frac, 0.01, 0.99) * (hi - lo)
+        if mid <= lo or mid >= hi:
+            break
+        c_mid = counter.count_le(mid)
+        if c_mid > k:
+            hi, c_hi = mid, c_mid
+        else:
+            lo, c_lo = mid, c_mid
+        step += 1
+
+    inside = counter.slopes_between(lo, hi)
+    return inside[min(max(k - c_lo, 0), inside.size - 1)]
+
+
+def theil_sen(x, y, rng=None):
+    """Theil–Sen line via O(n log² n) slope selection."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    counter = _SlopeCounter(x, y)
+    total = counter.total
+    if total == 0:
+        return Line(np.nan, np.nan)
+    rng = np.random.default_rng(rng)
+    k = (total - 1) // 2
+    slope = _select(counter, x, y, k, rng)
+    if total % 2 == 0:
+        slope = (slope + _select(counter, x, y, k + 1, rng)) / 2
+    return Line(slope, np.median(y - slope * x))
+
+
+def siegel(x, y, chunk=1000):
+    """Siegel repeated medians, computed in row chunks to bound memory."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    medians = []
+    for start in range(0, x.size, chunk):
+        dx = x[None, :] - x[start:start+chunk, None]
+        dy = y[None, :] - y[start:start+chunk, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = np.where(dx != 0, dy / dx, np.nan)
+        medians.append(np.nanmedian(s, axis=1))
+    medians = np.concatenate(medians)
+    slope = np.nanmedian(medians)
+    return Line(slope, np.median(y - slope * x))
+
+
+def huber(x, y, c=1.345, tol=1e-8, maxiter=100):
+    """Huber M-estimate by iteratively reweighted least squares."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    b, a = np.polyfit(x, y, deg=1)
+    for _ in range(maxiter):
+        res = y - (a + b * x)
+        scale = np.median(np.abs(res - np.median(res))) / 0.6745
+        if scale == 0:
+            break
+        u = np.abs(res / scale)
+        w = np.where(u <= c, 1.0, c / np.maximum(u, c))
+        b_new, a_new = np.polyfit(x, y, deg=1, w=np.sqrt(w))
+        done = abs(b_new - b) <= tol * (abs(b) + tol) and \
+            abs(a_new - a) <= tol * (abs(a) + tol)
+        b, a = b_new, a_new
+        if done:
+            break
+    return Line(b, a)
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+
+    # Anscombe's quartet, serie-02/aufgabe2.6.py
+    x = np.array([10, 8, 13, 9, 11, 14, 6, 4, 12, 7, 5])
+    y3 = np.array([7.46, 6.77, 12.74, 7.11, 7.8, 8.84, 6.08, 5.39, 8.15, 6.42, 5.73])
+    b, a = np.polyfit(x, y3, deg=1)
+    print('y3 polyfit:   y = {:.3f} + {:.3f}x'.format(a, b))
+    for name, f in [('theil-sen', theil_sen), ('siegel', siegel),
+                    ('huber', huber)]:
+        line = f(x, y3)
+        print('y3 {:10s} y = {:.3f} + {:.3f}x'.format(
+            name + ':', line.intercept, line.slope))
+
+    rng = np.random.default_rng(1)
+    for n in [1000, 3000, 10000, 100000]:
+        x = rng.normal(size=n)
+        y = 2 * x + rng.standard_t(df=2, size=n)
+        start = perf_counter()
+        fast = theil_sen(x, y, rng=1)
+        t_fast = perf_counter() - start
+        if n <= 10000:
+            start = perf_counter()
+            naive = theil_sen_naive(x, y)
+            t_naive = perf_counter() - start
+            print('n={:6d}: fast {:.3f}s, naive {:.3f}s, slopes {:.6f}/{:.6f}'
+                  .format(n, t_fast, t_naive, fast.slope, naive.slope))
+        else:
+            print('n={:6d}: fast {:.3f}s, slope {:.6f}'
+                  .format(n, t_fast, fast.slope))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Run exercise scripts in pre-warmed worker processes.
+
+Most scripts spend more time importing pandas, scipy.stats and matplotlib
+than computing. ``WarmPool`` starts its workers from a forkserver that has
+imported these libraries once, keeps the workers alive between scripts and
+runs independent scripts in parallel. Each script runs in its own directory,
+so relative paths like ``'child.csv'`` resolve as with ``python3 script.py``;
+its output is captured and returned with the result. Single steps of a
+script, marked by comments like ``# b)``, can be run on their own, after the
+script's setup (see ``statlib.instrument.run_script``).
+
+    python3 -m statlib.runner serie-03/*.py serie-04/*.py [--cold]
+    python3 -m statlib.runner serie-01/aufgabe1.3.py --step 'c)'
+
+``--cold`` also runs the scripts one after another in fresh interpreters
+and reports both wall times.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import importlib
+import importlib.util
+import io
+import multiprocessing
+import os
+import runpy
+import subprocess
+import sys
+from time import perf_counter
+import traceback
+
+PRELOAD = ['numpy', 'pandas', 'scipy.stats', 'matplotlib', 'matplotlib.pyplot']
+
+Result = namedtuple('Result', ['script', 'status', 'seconds', 'output', 'steps'])
+
+
+def available(modules):
+    """The modules that are installed; matplotlib is optional, for example."""
+    found = []
+    for name in modules:
+        try:
+            if importlib.util.find_spec(name.split('.')[0]) is not None:
+                found.append(name)
+        except ValueError:
+            pass
+    return found
+
+
+def _warm(modules):
+    # plt.show() must not block in a worker
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    for name in modules:
+        importlib.import_module(name)
+
+
+def _run(path, steps, only):
+    directory = os.path.dirname(path)
+    cwd = os.getcwd()
+    modules = set(sys.modules)
+    out = io.StringIO()
+    status = 0
+    records = None
+    start = perf_counter()
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            if steps or only is not None:
+                from statlib import instrument
+                rec = instrument.Recorder()
+                if steps:
+                    rec.enable()
+                try:
+                    instrument.run_script(path, rec, only)
+                finally:
+                    # stops tracemalloc, which would slow down the worker's
+                    # later scripts
+                    rec.disable()
+                    records = rec.records if steps else None
+            else:
+                os.chdir(directory)
+                sys.path.insert(0, directory)
+                try:
+                    runpy.run_path(path, run_name='__main__')
+                finally:
+                    sys.path.remove(directory)
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else int(e.code is not None)
+    except BaseException:
+        out.write(traceback.format_exc())
+        status = 1
+    finally:
+        seconds = perf_counter() - start
+        os.chdir(cwd)
+        # forget the script's own modules, keep the preloaded libraries warm
+        for name in set(sys.modules) - modules:
+            module = sys.modules[name]
+            if (getattr(module, '__file__', None) or '').startswith(directory):
+                del sys.modules[name]
+        if 'matplotlib.pyplot' in sys.modules:
+            sys.modules['matplotlib.pyplot'].close('all')
+    return Result(path, status, seconds, out.getvalue(), records)
+
+
+class WarmPool:
+
+    def __init__(self, workers=None, preload=PRELOAD):
+        self.workers = workers or os.cpu_count() or 1
+        self.preload = available(preload)
+        os.environ.setdefault('MPLBACKEND', 'Agg')
+        ctx = multiprocessing.get_context('forkserver')
+        # the forkserver imports these once; workers fork from it warm
+        ctx.set_forkserver_preload(self.preload)
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=ctx,
+                                            initializer=_warm,
+                                            initargs=(self.preload,))
+
+    def submit(self, script, steps=False, step=None):
+        """Run a script; with ``steps``, time its steps, see statlib.instrument.
+
+        ``step`` runs only the named step, or list of steps, after the setup.
+        """
+        return self.executor.submit(_run, os.path.abspath(script), steps,
+                                    step)
+
+    def run(self, script, steps=False, step=None):
+        return self.submit(script, steps, step).result()
+
+    def map(self, scripts, steps=False, step=None):
+        """Run independent scripts in parallel; results in the given order."""
+        futures = [self.submit(s, steps, step) for s in scripts]
+        return [f.result() for f in futures]
+
+    def warm_up(self):
+        """Start all workers now rather than on the first scripts."""
+        futures = [self.executor.submit(_warm, self.preload)
+                   for _ in range(self.workers)]
+        for f in futures:
+            f.result()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def run_cold(script):
+    """Run a script in a fresh interpreter, like ``python3 script.py``."""
+    path = os.path.abspath(script)
+    env = dict(os.environ, MPLBACKEND='Agg')
+    start = perf_counter()
+    proc = subprocess.run([sys.executable, path], cwd=os.path.dirname(path),
+                          env=env, capture_output=True, text=True)
+    return Result(path, proc.returncode, perf_counter() - start,
+                  proc.stdout + proc.stderr, None)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Run exercise scripts in pre-warmed worker processes.')
+    parser.add_argument('scripts', nargs='+')
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--cold', action='store_true',
+                        help='compare with sequential runs in fresh '
+                             'interpreters')
+    parser.add_argument('--quiet', action='store_true',
+                        help="don't print the scripts' output")
+    parser.add_argument('--steps', action='store_true',
+                        help='time the steps of each script')
+    parser.add_argument('--step', action='append',
+                        help="run only this step after the setup, e.g. 'b)'; "
+                             'may be repeated')
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    with WarmPool(args.workers) as pool:
+        pool.warm_up()
+        ready = perf_counter() - start
+        start = perf_counter()
+        results = pool.map(args.scripts, steps=args.steps, step=args.step)
+        warm = perf_counter() - start
+
+    status = 0
+    for res in results:
+        if not args.quiet:
+            print('==> {} <=='.format(os.path.relpath(res.script)))
+            print(res.output, end='')
+        for rec in res.steps or []:
+            print('  {:30s} {:8.4f}s'.format(rec['step'], rec['wall']))
+        status = status or res.status
+    print('\n{:40s} {:>8s} {:>8s}'.format('script', 'warm', 'cold'
+                                          if args.cold else ''))
+    cold_total = 0.0
+    for res in results:
+        cold = ''
+        if args.cold:
+            seconds = run_cold(res.script).seconds
+            cold_total += seconds
+            cold = '{:7.3f}s'.format(seconds)
+        print('{:40s} {:7.3f}s {:>8s}{}'.format(
+            os.path.relpath(res.script), res.seconds, cold,
+            '' if res.status == 0 else '  (failed)'))
+    print('pool start-up {:.3f}s, warm wall time {:.3f}s'.format(ready, warm))
+    if args.cold:
+        print('cold sequential wall time {:.3f}s ({:.1f}x)'.format(
+            cold_total, cold_total / warm))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Parallel parameter sweeps over simulation grids.
+
+``sweep`` runs a function for every cell of a parameter grid on a process
+pool, most expensive cells first, and collects one tidy row per cell: the
+parameters, the function's results and the cell's run time. With a
+``resume`` file, finished rows are appended as they arrive and skipped on
+the next run, so an interrupted sweep picks up where it stopped.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+import json
+import os
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from statlib.rng import RandomService
+
+
+def _plain(value):
+    # np.int64(0) and 0 must give the same cell id and seed
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def expand(grid):
+    """Cells of a grid given as dict of lists, or as a list of dicts.
+
+    NumPy scalars, e.g. from ``np.arange``, become Python numbers, as they
+    would be when read back from a resume file.
+    """
+    if isinstance(grid, dict):
+        names = list(grid)
+        cells = [dict(zip(names, values))
+                 for values in product(*(grid[n] for n in names))]
+    else:
+        cells = [dict(cell) for cell in grid]
+    return [{k: _plain(v) for k, v in cell.items()} for cell in cells]
+
+
+def default_cost(cell):
+    """Product of the numeric parameters, e.g. n·df for a t sample."""
+    cost = 1.0
+    for value in cell.values():
+        if isinstance(value, (int, float, np.number)) and \
+                not isinstance(value, bool):
+            cost *= abs(value) or 1
+    return cost
+
+
+# columns added to every row, which results must not use
+RESERVED = {'seconds', '_params'}
+
+
+def _cell_id(cell):
+    return json.dumps(cell, sort_keys=True, default=str)
+
+
+def _run_cell(func, cell, seed):
+    kwargs = dict(cell)
+    if seed is not None:
+        kwargs['seed'] = seed
+    start = perf_counter()
+    result = func(**kwargs)
+    elapsed = perf_counter() - start
+    if not isinstance(result, dict):
+        result = {'value': result}
+    return cell, result, elapsed
+
+
+def _params(row):
+    params = row['_params']
+    # older resume files list the parameter names only
+    if isinstance(params, list):
+        return {k: row[k] for k in params}
+    return params
+
+
+def _load(resume):
+    if resume is None or not os.path.exists(resume):
+        return []
+    rows = []
+    with open(resume, 'r+') as f:
+        lines = f.read().split('\n')
+        # the last line is incomplete after a crash in mid-write: drop it, so
+        # the next row starts on a line of its own
+        if lines[-1]:
+            f.truncate(len('\n'.join(lines[:-1]).encode('utf-8'))
+                       + (len(lines) > 1))
+        for line in lines[:-1]:
+            if line.strip():
+                rows.append(json.loads(line))
+    return rows
+
+
+def sweep_iter(func, grid, workers=None, cost=default_cost, seed=None,
+               resume=None):
+    """Yield one row dict per cell as soon as it completes.
+
+    ``func`` is called with the cell's parameters as keyword arguments and
+    returns a dict of results (or a single value), whose keys must differ
+    from the parameters and ``RESERVED``. If ``seed`` is given,
+    ``func`` also receives a ``seed`` SeedSequence derived from it and the
+    cell's parameters, so each cell is reproducible on its own, whatever the
+    order of execution. ``func`` must be importable by the worker processes.
+    """
+    done = _load(resume)
+    finished = {_cell_id(_params(row)) for row in done}
+    for row in done:
+        yield row
+
+    cells = [c for c in expand(grid) if _cell_id(c) not in finished]
+    cells.sort(key=cost, reverse=True)
+    service = RandomService(seed) if seed is not None else None
+
+    def seed_for(cell):
+        return service.seed_sequence(_cell_id(cell)) if service else None
+
+    out = open(resume, 'a') if resume is not None else None
+    try:
+        if workers == 1:
+            results = (_run_cell(func, c, seed_for(c)) for c in cells)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(workers)
+            futures = [executor.submit(_run_cell, func, c, seed_for(c))
+                       for c in cells]
+            results = (f.result() for f in as_completed(futures))
+        for cell, result, elapsed in results:
+            clash = (set(cell) | RESERVED) & set(result)
+            if clash:
+                raise ValueError('results overwrite parameters: {}'.format(
+                    ', '.join(sorted(clash))))
+            row = dict(cell)
+            row.update(result)
+            row['seconds'] = elapsed
+            row['_params'] = cell
+            if out is not None:
+                out.write(json.dumps(row, default=_json_value) + '\n')
+                out.flush()
+            yield row
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if out is not None:
+            out.close()
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def sweep(func, grid, workers=None, cost=default_cost, seed=None,
+          resume=None, progress=None):
+    """Run ``sweep_iter`` to completion and return the rows as a DataFrame.
+
+    ``progress`` is called with each row as it arrives.
+    """
+    rows = []
+    for row in sweep_iter(func, grid, workers, cost, seed, resume):
+        if progress is not None:
+            progress(row)
+        rows.append({k: v for k, v in row.items() if k != '_params'})
+    return pd.DataFrame(rows)
+
+
+def _qq_correlation(dist, n, df, seed):
+    # how normal a sample looks: correlation of its normal Q-Q plot,
+    # averaged over many samples as in serie-05/aufgabe5.1.py
+    import scipy.stats as st
+    rng = np.random.default_rng(seed)
+    draw = {'t': lambda: rng.standard_t(df, size=(1000, n)),
+            'chi2': lambda: rng.chisquare(df, size=(1000, n))}[dist]
+    x = np.sort(draw(), axis=1)
+    q = st.norm.ppf((np.arange(1, n + 1) - 0.5) / n)
+    xc = x - x.mean(axis=1, keepdims=True)
+    r = xc @ (q - q.mean()) / np.sqrt((xc * xc).sum(axis=1)
+                                      * ((q - q.mean())**2).sum())
+    return {'r_mean': r.mean(), 'r_min': r.min()}
+
+
+if __name__ == '__main__':
+    grid = {'dist': ['t', 'chi2'], 'n': [20, 100, 1000], 'df': [1, 7, 20]}
+    start = perf_counter()
+    table = sweep(_qq_correlation, grid, seed=1,
+                  progress=lambda row: print('done: {dist} n={n} df={df} '
+                                             '({seconds:.3f}s)'.format(**row)))
+    print(table.sort_values(by=['dist', 'n', 'df']).to_string(index=False))
+    print('total: {:.3f}s, sum of cells: {:.3f}s'.format(
+        perf_counter() - start, table['seconds'].sum()))
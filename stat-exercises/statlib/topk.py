@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Streaming top-k / bottom-k selection with bounded heaps."""
+
+import heapq
+from itertools import count
+
+import numpy as np
+import pandas as pd
+
+
+class TopK:
+    """Keep the k largest (or smallest) values seen so far.
+
+    The heap never holds more than k entries, so feeding n values costs
+    O(n log k). Ties are broken in favour of the value seen first.
+    """
+
+    def __init__(self, k, largest=True):
+        if k < 0:
+            raise ValueError('k must not be negative: {}'.format(k))
+        self.k = k
+        self.largest = largest
+        self._heap = []
+        self._seq = count()
+
+    def push(self, label, value):
+        if value != value or not self.k:  # NaN, or nothing to keep
+            return
+        key = value if self.largest else -value
+        # the heap root is the worst entry kept; later ties rank lower
+        entry = (key, -next(self._seq), label, value)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def update(self, labels, values):
+        """Feed a whole chunk; only its own k best candidates reach the heap."""
+        if not self.k:
+            return
+        values = np.asarray(values, dtype=float)
+        ok = ~np.isnan(values)
+        keys = np.where(ok, values if self.largest else -values, -np.inf)
+        if keys.size > self.k:
+            # stable selection: of the values tied with the k-th best, keep
+            # the first ones, as a stable sort would
+            kth = np.partition(keys, keys.size - self.k)[keys.size - self.k]
+            above = np.flatnonzero(keys > kth)
+            ties = np.flatnonzero(keys == kth)[:self.k - above.size]
+            cand = np.sort(np.concatenate([above, ties]))
+        else:
+            cand = np.arange(keys.size)
+        if len(self._heap) == self.k:
+            cand = cand[keys[cand] >= self._heap[0][0]]
+        for i in cand:
+            if ok[i]:
+                self.push(labels[i], values[i])
+
+    def result(self):
+        """Return the kept entries as a Series, best first."""
+        best = sorted(self._heap, reverse=True)
+        return pd.Series([e[3] for e in best], index=[e[2] for e in best],
+                         dtype=float)
+
+
+def _chunks(data):
+    if isinstance(data, pd.DataFrame):
+        return [data]
+    return data
+
+
+def topk(data, columns, k=5, largest=True):
+    """Rank several columns in a single pass over ``data``.
+
+    ``data`` is a DataFrame or an iterable of DataFrame chunks, e.g. from
+    ``pd.read_csv(..., chunksize=100000)``. ``columns`` is a list of column
+    names or a dict mapping each column to its own ``largest`` flag. Returns a
+    dict mapping each column to a Series of its k best values, indexed by the
+    row labels.
+    """
+    if not isinstance(columns, dict):
+        columns = {c: largest for c in columns}
+    heaps = {c: TopK(k, lg) for c, lg in columns.items()}
+    for chunk in _chunks(data):
+        labels = chunk.index.to_numpy()
+        for c, heap in heaps.items():
+            heap.update(labels, chunk[c].to_numpy())
+    return {c: heap.result().rename(c) for c, heap in heaps.items()}
+
+
+def nlargest(data, column, k=5):
+    return topk(data, [column], k=k, largest=True)[column]
+
+
+def nsmallest(data, column, k=5):
+    return topk(data, [column], k=k, largest=False)[column]
+
+
+if __name__ == '__main__':
+    from timeit import timeit
+
+    rng = np.random.default_rng(1)
+    for n in [10**4, 10**5, 10**6]:
+        df = pd.DataFrame({'a': rng.normal(size=n), 'b': rng.normal(size=n)})
+        chunks = [df.iloc[i:i+100000] for i in range(0, n, 100000)]
+        expected = df.sort_values(by='a', ascending=False)['a'][:5]
+        assert (nlargest(chunks, 'a').index == expected.index).all()
+        # ties, as in the Drunkenness column: the first rows win
+        tied = pd.DataFrame({'c': rng.integers(0, 10, size=n)})
+        tied_chunks = [tied.iloc[i:i+100000] for i in range(0, n, 100000)]
+        for largest in [True, False]:
+            expected = tied.sort_values(by='c', ascending=not largest,
+                                        kind='stable')['c'][:5]
+            got = topk(tied_chunks, ['c'], largest=largest)['c']
+            assert (got.index == expected.index).all()
+
+        t_sort = timeit(lambda: (df.sort_values(by='a', ascending=False)[:5],
+                                 df.sort_values(by='b')[:5]), number=5) / 5
+        t_topk = timeit(lambda: topk(chunks, {'a': True, 'b': False}),
+                        number=5) / 5
+        print('n={:8d}: sort_values {:.4f}s, topk {:.4f}s'
+              .format(n, t_sort, t_topk))
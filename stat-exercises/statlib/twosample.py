@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Two-sample comparisons: vectorized Welch t-tests and permutation tests."""
+
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb, sqrt
+import os
+
+import numpy as np
+from scipy.stats import t as t_dist
+
+from statlib.rng import as_seed_sequence
+
+WelchResult = namedtuple('WelchResult', ['t', 'df', 'p', 'diff', 'se'])
+PermutationResult = namedtuple('PermutationResult',
+                               ['diff', 'p', 'n_perm', 'exact'])
+
+
+def group_stats(groups):
+    """Return sizes, means and sample variances (ddof=1) of each group."""
+    n = np.array([len(g) for g in groups], dtype=float)
+    mean = np.array([np.mean(g) for g in groups])
+    var = np.array([np.var(g, ddof=1) for g in groups])
+    return n, mean, var
+
+
+def welch_pairs(groups, pairs=None, alternative='two-sided'):
+    """Welch t-tests for many pairs of groups in one vectorized call.
+
+    ``groups`` is a sequence of 1-D samples (lengths may differ), ``pairs``
+    a sequence of (i, j) index pairs; by default all pairs i < j are tested.
+    Every field of the result is an array with one entry per pair.
+    """
+    n, mean, var = group_stats(groups)
+    if pairs is None:
+        pairs = list(combinations(range(len(groups)), 2))
+    idx = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    i, j = idx[:, 0], idx[:, 1]
+
+    vi = var[i] / n[i]
+    vj = var[j] / n[j]
+    se = np.sqrt(vi + vj)
+    diff = mean[i] - mean[j]
+    t = diff / se
+    df = (vi + vj)**2 / (vi**2 / (n[i] - 1) + vj**2 / (n[j] - 1))
+
+    if alternative == 'two-sided':
+        p = 2 * t_dist.sf(np.abs(t), df)
+    elif alternative == 'greater':
+        p = t_dist.sf(t, df)
+    elif alternative == 'less':
+        p = t_dist.cdf(t, df)
+    else:
+        raise ValueError('unknown alternative: {}'.format(alternative))
+    return WelchResult(t, df, p, diff, se)
+
+
+def welch(a, b, alternative='two-sided'):
+    """Welch t-test for a single pair; returns scalars."""
+    res = welch_pairs([a, b], [(0, 1)], alternative=alternative)
+    return WelchResult(*(float(v[0]) for v in res))
+
+
+def _extreme(diffs, observed, alternative, tol):
+    # differences within ``tol`` of the observed one are ties and count
+    if alternative == 'two-sided':
+        return np.abs(diffs) >= abs(observed) - tol
+    if alternative == 'greater':
+        return diffs >= observed - tol
+    if alternative == 'less':
+        return diffs <= observed + tol
+    raise ValueError('unknown alternative: {}'.format(alternative))
+
+
+def _batch_diffs(pooled, n_a, index):
+    # index has shape (batch, n): each row is one permutation of the pool
+    perm = pooled[index]
+    return perm[:, :n_a].mean(axis=1) - perm[:, n_a:].mean(axis=1)
+
+
+def _count_batch(args):
+    pooled, n_a, observed, alternative, tol, batch, seed = args
+    rng = np.random.default_rng(seed)
+    index = rng.permuted(np.tile(np.arange(pooled.size), (batch, 1)), axis=1)
+    diffs = _batch_diffs(pooled, n_a, index)
+    return int(_extreme(diffs, observed, alternative, tol).sum())
+
+
+def _in_order(executor, tasks, ahead):
+    # results of _count_batch in task order, with ``ahead`` tasks in flight
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(_count_batch, task))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _exact(pooled, n_a, observed, alternative, tol):
+    n = pooled.size
+    total = pooled.sum()
+    sums = np.array([pooled[list(c)].sum() for c in combinations(range(n), n_a)])
+    diffs = sums / n_a - (total - sums) / (n - n_a)
+    hits = int(_extreme(diffs, observed, alternative, tol).sum())
+    return hits / diffs.size, diffs.size
+
+
+def permutation_test(a, b, alternative='two-sided', n_perm=100000,
+                     batch=2000, precision=0.001, workers=None, seed=None):
+    """Permutation test for the difference of means ``mean(a) - mean(b)``.
+
+    If the number of distinct splits is at most ``n_perm``, all of them are
+    enumerated and the exact p-value is returned. Otherwise permutations are
+    drawn as ``(batch, n)`` index matrices, spread across ``workers``
+    processes (``1`` runs in-process), and sampling stops early once the
+    standard error of the p-value estimate drops below ``precision``.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    pooled = np.concatenate([a, b])
+    # centred, the differences don't depend on the level of the data; nor
+    # does the tolerance for ties, relative to its spread
+    pooled -= pooled.mean()
+    n_a = a.size
+    observed = float(pooled[:n_a].mean() - pooled[n_a:].mean())
+    tol = 1e-9 * pooled.std()
+
+    if comb(pooled.size, n_a) <= n_perm:
+        p, count = _exact(pooled, n_a, observed, alternative, tol)
+        return PermutationResult(observed, p, count, True)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    seeds = as_seed_sequence(seed).spawn(-(-n_perm // batch))
+    tasks = [(pooled, n_a, observed, alternative, tol, batch, s)
+             for s in seeds]
+    hits = 0
+    done = 0
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        counts = map(_count_batch, tasks) if executor is None \
+            else _in_order(executor, tasks, 2 * workers)
+        # the stopping rule sees the batches in seed order, one at a time,
+        # so the result doesn't depend on the number of workers
+        for count in counts:
+            hits += count
+            done += batch
+            # add-one estimate, so the p-value is never exactly zero
+            p = (hits + 1) / (done + 1)
+            if sqrt(p * (1 - p) / done) < precision:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return PermutationResult(observed, (hits + 1) / (done + 1), done, False)
+
+
+if __name__ == '__main__':
+    # heat of fusion of ice, methods A and B (serie-04/aufgabe4.5.py)
+    a = [79.98, 80.04, 80.02, 80.04, 80.03, 80.03, 80.04, 79.97, 80.05, 80.03,
+         80.02, 80.00, 80.02]
+    b = [80.02, 79.94, 79.98, 79.97, 79.97, 80.03, 79.95, 80.03, 79.95, 79.97]
+
+    res = welch(a, b)
+    print('Welch: t={:.4f}, df={:.2f}, p={:.5f}'.format(res.t, res.df, res.p))
+
+    res = permutation_test(a, b, seed=1)
+    print('Permutation: diff={:.4f}, p={:.5f} ({} permutations, exact={})'
+          .format(res.diff, res.p, res.n_perm, res.exact))
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Rolling and resampling window statistics with O(1) updates.
+
+``Rolling`` and ``Resampler`` are streaming operators fed one observation at
+a time; ``rolling`` and ``resample`` apply the same statistics in batch to
+NumPy arrays.
+"""
+
+from collections import deque, namedtuple
+
+import numpy as np
+
+Bucket = namedtuple('Bucket', ['start', 'count', 'mean', 'min', 'max',
+                               'first', 'last'])
+
+
+class Rolling:
+    """Statistics over the last ``size`` observations.
+
+    Sum, mean and variance are updated in O(1) with a sliding Welford step,
+    min and max in amortized O(1) with monotonic deques. Quantiles are
+    approximated from a histogram of ``bins`` equal bins, initially over
+    ``[lo, hi]`` or, without a range, over the window's values at the first
+    call of ``quantile``. Values outside the range are not clamped: the range
+    doubles, merging pairs of bins, until it covers them, so the resolution
+    only ever gets coarser; pass a generous range for a drifting series.
+    """
+
+    def __init__(self, size, lo=None, hi=None, bins=256):
+        self.size = size
+        self._values = deque()
+        self._count = 0
+        # number of valid values in the window, which the moments are over
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        # deques of (position, value), values decreasing resp. increasing
+        self._maxq = deque()
+        self._minq = deque()
+        # an even number of bins, so that pairs can be merged
+        self._bins = bins + bins % 2
+        self._hist = None
+        if lo is not None and hi is not None:
+            self._init_hist(lo, hi)
+
+    def _init_hist(self, lo, hi):
+        self._lo = float(lo)
+        span = float(hi) - self._lo or (abs(self._lo) or 1.0) * 1e-3
+        self._width = span / self._bins
+        self._hist = np.zeros(self._bins, dtype=np.int64)
+
+    def _grow(self, x):
+        half = self._bins // 2
+        while x < self._lo or x > self._lo + self._bins * self._width:
+            merged = self._hist.reshape(half, 2).sum(axis=1)
+            self._hist[:] = 0
+            if x < self._lo:
+                self._hist[half:] = merged
+                self._lo -= self._bins * self._width
+            else:
+                self._hist[:half] = merged
+            self._width *= 2
+
+    def _bin(self, x):
+        i = int((x - self._lo) / self._width)
+        # x == hi falls just past the last bin
+        return min(max(i, 0), self._bins - 1)
+
+    def _add(self, x, count):
+        if np.isfinite(x):
+            if count > 0:
+                self._grow(x)
+            self._hist[self._bin(x)] += count
+
+    def _remove(self, old):
+        # Welford's update run backwards
+        self._n -= 1
+        if not self._n:
+            self._mean = self._m2 = 0.0
+            return
+        delta = old - self._mean
+        self._mean -= delta / self._n
+        self._m2 -= delta * (old - self._mean)
+
+    def push(self, x):
+        """Add an observation; NaNs take a place in the window but are
+        skipped by the statistics, as in ``rolling``."""
+        x = float(x)
+        pos = self._count
+        self._count += 1
+        self._values.append(x)
+        old = self._values.popleft() if len(self._values) > self.size \
+            else np.nan
+        valid = x == x
+        if valid and old == old:
+            # the sliding step: one value out, one in, n unchanged
+            mean = self._mean + (x - old) / self._n
+            self._m2 += (x - old) * (x - mean + old - self._mean)
+            self._mean = mean
+        elif old == old:
+            self._remove(old)
+        elif valid:
+            self._n += 1
+            delta = x - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (x - self._mean)
+        if self._hist is not None and old == old:
+            self._add(old, -1)
+
+        if valid:
+            while self._maxq and self._maxq[-1][1] <= x:
+                self._maxq.pop()
+            self._maxq.append((pos, x))
+            while self._minq and self._minq[-1][1] >= x:
+                self._minq.pop()
+            self._minq.append((pos, x))
+        expired = pos - self.size
+        if self._maxq and self._maxq[0][0] <= expired:
+            self._maxq.popleft()
+        if self._minq and self._minq[0][0] <= expired:
+            self._minq.popleft()
+
+        if self._hist is not None and valid:
+            self._add(x, 1)
+        return self
+
+    @property
+    def full(self):
+        return len(self._values) == self.size
+
+    @property
+    def count(self):
+        """The number of valid (non-NaN) observations in the window."""
+        return self._n
+
+    @property
+    def sum(self):
+        return self._mean * self._n if self._n else np.nan
+
+    @property
+    def mean(self):
+        return self._mean if self._n else np.nan
+
+    @property
+    def var(self):
+        n = self._n
+        return max(self._m2, 0.0) / (n - 1) if n > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def min(self):
+        return self._minq[0][1] if self._minq else np.nan
+
+    @property
+    def max(self):
+        return self._maxq[0][1] if self._maxq else np.nan
+
+    def quantile(self, q):
+        """Approximate quantile, accurate to about one bin width."""
+        if not self._values:
+            return np.nan
+        if self._hist is None:
+            finite = [v for v in self._values if np.isfinite(v)]
+            if not finite:
+                return np.nan
+            self._init_hist(min(finite), max(finite))
+            for v in finite:
+                self._add(v, 1)
+        cum = np.cumsum(self._hist)
+        if not cum[-1]:
+            return np.nan
+        i = int(np.searchsorted(cum, q * cum[-1]))
+        # interpolate linearly within the bin
+        below = cum[i-1] if i > 0 else 0
+        frac = (q * cum[-1] - below) / self._hist[i] if self._hist[i] else 0.5
+        return self._lo + (i + frac) * self._width
+
+
+def _sliding_extreme(x, size, take_max):
+    out = np.full(x.size, np.nan)
+    q = deque()
+    for i, v in enumerate(x):
+        if q and q[0] <= i - size:
+            q.popleft()
+        if v == v:  # NaNs are skipped, like pandas does
+            if take_max:
+                while q and x[q[-1]] <= v:
+                    q.pop()
+            else:
+                while q and x[q[-1]] >= v:
+                    q.pop()
+            q.append(i)
+        if q:
+            out[i] = x[q[0]]
+    return out
+
+
+def _block_sums(x, valid, size):
+    # per-element prefix sums within blocks of ``size`` values, centred on
+    # the block's mean, so the squares cancel no worse than within a window
+    nb = -(-x.size // size)
+    pad = nb * size - x.size
+    v = np.concatenate([valid, np.zeros(pad, dtype=bool)]).reshape(nb, size)
+    xb = np.concatenate([np.where(valid, x, 0.0), np.zeros(pad)])
+    xb = xb.reshape(nb, size)
+    c = v.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        m = np.where(c > 0, xb.sum(axis=1) / c, 0.0)
+    y = np.where(v, xb - m[:, None], 0.0)
+    p0 = np.cumsum(v, axis=1)
+    p1 = np.cumsum(y, axis=1)
+    p2 = np.cumsum(y * y, axis=1)
+    return m, (p0, p1, p2)
+
+
+def rolling(x, size, stats=('mean',), min_periods=None):
+    """Rolling statistics over a 1-D array, aligned like pandas' rolling().
+
+    Returns a dict mapping each of the requested ``stats`` (sum, mean, var,
+    std, min, max) to an array of the same length as ``x``; positions with
+    fewer than ``min_periods`` (default: ``size``) valid observations are
+    NaN, and NaNs in ``x`` are skipped, as in pandas.
+
+    Sums and moments come from prefix sums within blocks of ``size`` values,
+    so the whole batch is O(n): every window is the head of one block and the
+    tail of the one before, and their moments are combined like Welford's
+    and Chan's updates do, without the cancellation of global cumulative
+    sums on a drifting series.
+    """
+    x = np.asarray(x, dtype=float)
+    if min_periods is None:
+        min_periods = size
+    valid = ~np.isnan(x)
+    n_all = x.size
+    i = np.arange(n_all)
+    m, prefix = _block_sums(x, valid, size)
+    b = i // size
+    head = [p.ravel()[:n_all] for p in prefix]
+    # the tail of the previous block: its total minus its prefix up to i-size
+    j = i - size
+    has_tail = j >= 0
+    jj = np.where(has_tail, j, 0)
+    prev = np.maximum(b - 1, 0)
+    tail = [np.where(has_tail, p[prev, -1] - p.ravel()[jj], 0.0)
+            for p in prefix]
+    na, sa1, sa2 = head
+    nb, sb1, sb2 = tail
+    n = na + nb
+
+    out = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_a = m[b] + sa1 / na
+        mean_b = m[prev] + sb1 / nb
+        total = na * m[b] + sa1 + nb * m[prev] + sb1
+        for stat in stats:
+            if stat == 'sum':
+                value = np.where(n > 0, total, np.nan)
+            elif stat == 'mean':
+                value = total / n
+            elif stat in ('var', 'std'):
+                m2 = (np.where(na > 0, sa2 - sa1 * sa1 / na, 0.0)
+                      + np.where(nb > 0, sb2 - sb1 * sb1 / nb, 0.0))
+                both = (na > 0) & (nb > 0)
+                delta = np.where(both, mean_b - mean_a, 0.0)
+                m2 += delta * delta * na * nb / np.where(both, n, 1)
+                value = np.maximum(m2, 0.0) / (n - 1)
+                value[n < 2] = np.nan
+                if stat == 'std':
+                    value = np.sqrt(value)
+            elif stat in ('min', 'max'):
+                value = _sliding_extreme(x, size, stat == 'max')
+            else:
+                raise ValueError('unknown statistic: {}'.format(stat))
+            value[n < max(min_periods, 1)] = np.nan
+            out[stat] = value
+    return out
+
+
+class Resampler:
+    """Aggregate a timestamped stream into buckets of fixed ``width``.
+
+    ``push`` returns the finished ``Bucket`` whenever an observation falls
+    beyond the current one, otherwise None; ``flush`` returns the last one.
+    Empty buckets in between are skipped, like ``resample`` followed by
+    ``dropna``.
+    """
+
+    def __init__(self, width, origin=0):
+        self.width = width
+        self.origin = origin
+        self._start = None
+
+    def _reset(self, start, x):
+        self._start = start
+        self._n = 1
+        self._sum = x
+        self._min = self._max = self._first = self._last = x
+
+    def _bucket(self):
+        return Bucket(self._start, self._n, self._sum / self._n, self._min,
+                      self._max, self._first, self._last)
+
+    def push(self, t, x):
+        start = self.origin + (t - self.origin) // self.width * self.width
+        if self._start is None:
+            self._reset(start, x)
+            return None
+        if start != self._start:
+            done = self._bucket()
+            self._reset(start, x)
+            return done
+        self._n += 1
+        self._sum += x
+        self._min = min(self._min, x)
+        self._max = max(self._max, x)
+        self._last = x
+        return None
+
+    def flush(self):
+        if self._start is None:
+            return None
+        done = self._bucket()
+        self._start = None
+        return done
+
+
+def resample(t, x, width, origin=0):
+    """Batch counterpart of ``Resampler`` for sorted timestamps ``t``.
+
+    Returns bucket starts, counts and means of the non-empty buckets.
+    """
+    t = np.asarray(t)
+    x = np.asarray(x, dtype=float)
+    key = (t - origin) // width
+    starts, first, counts = np.unique(key, return_index=True,
+                                      return_counts=True)
+    sums = np.add.reduceat(x, first) if x.size else np.array([])
+    return origin + starts * width, counts, sums / counts
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+
+    rng = np.random.default_rng(1)
+    prices = 100 + np.cumsum(rng.normal(size=10**5))
+
+    start = perf_counter()
+    batch = rolling(prices, 30, stats=('mean', 'std', 'min', 'max'))
+    print('batch:     {:.3f}s'.format(perf_counter() - start))
+
+    start = perf_counter()
+    # no range given: the quantile histogram adapts to the drifting prices
+    win = Rolling(30)
+    for p in prices:
+        win.push(p)
+    print('streaming: {:.3f}s'.format(perf_counter() - start))
+
+    print('mean={:.4f}/{:.4f}, std={:.4f}/{:.4f}, min={:.4f}/{:.4f}'.format(
+        batch['mean'][-1], win.mean, batch['std'][-1], win.std,
+        batch['min'][-1], win.min))
+    print('median~{:.4f}, exact {:.4f}'.format(win.quantile(0.5),
+                                              np.median(prices[-30:])))